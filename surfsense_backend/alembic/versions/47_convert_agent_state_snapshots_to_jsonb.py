@@ -0,0 +1,57 @@
+"""Convert agent_state_snapshots.state_data to JSONB with a GIN index
+
+Revision ID: 47
+Revises: d4b933e25f62
+
+Changes:
+1. Change agent_state_snapshots.state_data from JSON to JSONB
+2. Add a GIN (jsonb_path_ops) index on state_data for containment (@>) lookups
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "47"
+down_revision: str | None = "d4b933e25f62"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Store state_data as binary JSONB and index it for containment queries."""
+    op.alter_column(
+        "agent_state_snapshots",
+        "state_data",
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using="state_data::jsonb",
+    )
+    op.create_index(
+        "ix_agent_state_snapshots_state_gin",
+        "agent_state_snapshots",
+        ["state_data"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"state_data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Drop the GIN index and revert state_data to JSON."""
+    op.drop_index(
+        "ix_agent_state_snapshots_state_gin", table_name="agent_state_snapshots"
+    )
+    op.alter_column(
+        "agent_state_snapshots",
+        "state_data",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using="state_data::json",
+    )
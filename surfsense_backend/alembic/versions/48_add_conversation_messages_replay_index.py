@@ -0,0 +1,52 @@
+"""Replace conversation_messages checkpoint index with a covering replay index
+
+Revision ID: 48
+Revises: 47
+
+Changes:
+1. Drop idx_conversation_messages_checkpoint (conversation_id, checkpoint_id)
+2. Add idx_conversation_messages_replay on
+   (conversation_id, checkpoint_id, sequence_number) INCLUDE (role, timestamp)
+
+Message replay filters by conversation/checkpoint and orders by
+sequence_number, so the extra key column removes the sort step. content is
+deliberately left out of INCLUDE because large TOAST-ed values would bloat
+the index.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "48"
+down_revision: str | None = "47"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Swap the two-column index for the covering replay index."""
+    op.create_index(
+        "idx_conversation_messages_replay",
+        "conversation_messages",
+        ["conversation_id", "checkpoint_id", "sequence_number"],
+        unique=False,
+        postgresql_include=["role", "timestamp"],
+    )
+    op.drop_index(
+        "idx_conversation_messages_checkpoint", table_name="conversation_messages"
+    )
+
+
+def downgrade() -> None:
+    """Restore the original (conversation_id, checkpoint_id) index."""
+    op.create_index(
+        "idx_conversation_messages_checkpoint",
+        "conversation_messages",
+        ["conversation_id", "checkpoint_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "idx_conversation_messages_replay", table_name="conversation_messages"
+    )
@@ -0,0 +1,171 @@
+"""Range-partition conversation_messages by month on timestamp
+
+Revision ID: 49
+Revises: 48
+
+Changes:
+1. Rebuild conversation_messages as a PARTITION BY RANGE (timestamp) parent
+   with primary key (id, timestamp)
+2. Pre-create monthly partitions covering existing rows plus three months ahead,
+   and a DEFAULT partition that catches rows outside every monthly range
+3. Copy existing rows into the partitioned table and keep the id sequence
+
+Retention then becomes DETACH PARTITION + DROP TABLE (see
+app.services.persistence.checkpoint_retention) instead of a table-wide DELETE.
+
+conversation_checkpoints is intentionally left unpartitioned: its UNIQUE
+checkpoint_id cannot be enforced on a partitioned table without adding the
+partition key to the constraint.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "49"
+down_revision: str | None = "48"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MONTHS_AHEAD = 3
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        "idx_conversation_messages_replay",
+        "conversation_messages",
+        ["conversation_id", "checkpoint_id", "sequence_number"],
+        unique=False,
+        postgresql_include=["role", "timestamp"],
+    )
+    op.create_index(
+        "ix_conversation_messages_conversation_id",
+        "conversation_messages",
+        ["conversation_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_conversation_messages_checkpoint_id",
+        "conversation_messages",
+        ["checkpoint_id"],
+        unique=False,
+    )
+
+
+def upgrade() -> None:
+    """Move conversation_messages onto a monthly range-partitioned parent."""
+    # Detach the id sequence so it survives dropping the old table
+    op.execute("ALTER SEQUENCE conversation_messages_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE conversation_messages_partitioned (
+            id INTEGER NOT NULL DEFAULT nextval('conversation_messages_id_seq'),
+            conversation_id VARCHAR(256) NOT NULL,
+            checkpoint_id VARCHAR(256) NOT NULL,
+            role VARCHAR(50) NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            sequence_number INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+
+    # One partition per month, from the oldest stored message up to a few
+    # months ahead; the nightly retention task keeps rolling this window.
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month_start date;
+            last_month date := date_trunc('month', now())::date
+                + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(timestamp), now()))::date
+              INTO month_start
+              FROM conversation_messages;
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE conversation_messages_%s PARTITION OF '
+                    'conversation_messages_partitioned FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$;
+        """
+    )
+    # Rows stamped outside the pre-created window (clock skew, backfills, or
+    # a missed retention run) land here instead of failing the INSERT.
+    op.execute(
+        "CREATE TABLE conversation_messages_default "
+        "PARTITION OF conversation_messages_partitioned DEFAULT"
+    )
+
+    op.execute(
+        """
+        INSERT INTO conversation_messages_partitioned
+            (id, conversation_id, checkpoint_id, role, content, timestamp,
+             sequence_number, created_at)
+        SELECT id, conversation_id, checkpoint_id, role, content, timestamp,
+               sequence_number, created_at
+          FROM conversation_messages
+        """
+    )
+
+    op.drop_table("conversation_messages")
+    op.rename_table("conversation_messages_partitioned", "conversation_messages")
+    op.execute(
+        "ALTER TABLE conversation_messages "
+        "ADD CONSTRAINT conversation_messages_pkey PRIMARY KEY (id, timestamp)"
+    )
+    op.execute(
+        "ALTER SEQUENCE conversation_messages_id_seq "
+        "OWNED BY conversation_messages.id"
+    )
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Collapse the partitions back into a single heap table."""
+    op.execute("ALTER SEQUENCE conversation_messages_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE conversation_messages_plain (
+            id INTEGER NOT NULL DEFAULT nextval('conversation_messages_id_seq'),
+            conversation_id VARCHAR(256) NOT NULL,
+            checkpoint_id VARCHAR(256) NOT NULL,
+            role VARCHAR(50) NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            sequence_number INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO conversation_messages_plain
+        SELECT id, conversation_id, checkpoint_id, role, content, timestamp,
+               sequence_number, created_at
+          FROM conversation_messages
+        """
+    )
+
+    # Dropping the parent drops every attached partition with it
+    op.drop_table("conversation_messages")
+    op.rename_table("conversation_messages_plain", "conversation_messages")
+    op.execute(
+        "ALTER TABLE conversation_messages "
+        "ADD CONSTRAINT conversation_messages_pkey PRIMARY KEY (id)"
+    )
+    op.execute(
+        "ALTER SEQUENCE conversation_messages_id_seq "
+        "OWNED BY conversation_messages.id"
+    )
+    _create_indexes()
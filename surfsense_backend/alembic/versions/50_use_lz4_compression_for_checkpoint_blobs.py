@@ -0,0 +1,61 @@
+"""Use LZ4 TOAST compression for LangGraph checkpoint payload columns
+
+Revision ID: 50
+Revises: 49
+
+Changes:
+1. SET COMPRESSION lz4 on checkpoint_blobs.data, checkpoint_writes.data and
+   checkpoints.pending_sends
+
+LZ4 decompresses considerably faster than the default pglz, which matters
+because every checkpoint restore reads these blobs. Column compression needs
+PostgreSQL 14+ built with LZ4; on servers without it the migration leaves the
+columns on pglz instead of failing. Only newly written values are affected.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "50"
+down_revision: str | None = "49"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COMPRESSED_COLUMNS = [
+    ("checkpoint_blobs", "data"),
+    ("checkpoint_writes", "data"),
+    ("checkpoints", "pending_sends"),
+]
+
+
+def _set_compression(method: str) -> None:
+    statements = " ".join(
+        f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION {method};"
+        for table, column in COMPRESSED_COLUMNS
+    )
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF current_setting('server_version_num')::int < 140000 THEN
+                RAISE NOTICE 'Column compression requires PostgreSQL 14+, skipping';
+                RETURN;
+            END IF;
+            {statements}
+        EXCEPTION WHEN feature_not_supported THEN
+            RAISE NOTICE '{method} compression is not supported by this server, skipping';
+        END $$;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Switch checkpoint payload columns to LZ4 compression."""
+    _set_compression("lz4")
+
+
+def downgrade() -> None:
+    """Restore the default pglz compression."""
+    _set_compression("pglz")
@@ -0,0 +1,43 @@
+"""Drop single-column checkpoint indexes shadowed by composite indexes
+
+Revision ID: 51
+Revises: 50
+
+Changes:
+1. Drop ix_conversation_messages_conversation_id and
+   ix_conversation_messages_checkpoint_id; idx_conversation_messages_replay
+   (conversation_id, checkpoint_id, sequence_number) serves both lookups
+2. Drop ix_conversation_checkpoints_conversation_id; idx_checkpoints_timestamp
+   (conversation_id, timestamp) is left-anchored on the same column
+
+The unique index on conversation_checkpoints.checkpoint_id is kept because it
+enforces uniqueness.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "51"
+down_revision: str | None = "50"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+REDUNDANT_INDEXES = [
+    ("ix_conversation_messages_conversation_id", "conversation_messages", "conversation_id"),
+    ("ix_conversation_messages_checkpoint_id", "conversation_messages", "checkpoint_id"),
+    ("ix_conversation_checkpoints_conversation_id", "conversation_checkpoints", "conversation_id"),
+]
+
+
+def upgrade() -> None:
+    """Drop indexes that only add write amplification."""
+    for index_name, _table_name, _column in REDUNDANT_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    """Recreate the single-column indexes."""
+    for index_name, table_name, column in REDUNDANT_INDEXES:
+        op.create_index(index_name, table_name, [column], unique=False)
@@ -0,0 +1,55 @@
+"""Drop per-row updated_at triggers from checkpoint tables
+
+Revision ID: 52
+Revises: 51
+
+Changes:
+1. Drop update_conversation_checkpoints_updated_at and
+   update_agent_state_snapshots_updated_at BEFORE UPDATE triggers
+2. Drop the update_updated_at_column() trigger function
+
+The triggers invoked PL/pgSQL for every updated row. Writers to these tables
+set updated_at themselves (updated_at = now() in the UPDATE, or onupdate in
+an ORM mapping); the server_default still covers inserts.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "52"
+down_revision: str | None = "51"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TRIGGERS = [
+    ("update_conversation_checkpoints_updated_at", "conversation_checkpoints"),
+    ("update_agent_state_snapshots_updated_at", "agent_state_snapshots"),
+]
+
+
+def upgrade() -> None:
+    """Remove the updated_at triggers and their function."""
+    for trigger_name, table_name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger_name} ON {table_name};")
+    op.execute("DROP FUNCTION IF EXISTS update_updated_at_column();")
+
+
+def downgrade() -> None:
+    """Recreate the trigger function and triggers."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_updated_at_column()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for trigger_name, table_name in TRIGGERS:
+        op.execute(f"""
+            CREATE TRIGGER {trigger_name}
+            BEFORE UPDATE ON {table_name}
+            FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+        """)
@@ -0,0 +1,52 @@
+"""Add BRIN indexes on checkpoint/message timestamps for retention scans
+
+Revision ID: 53
+Revises: 52
+
+Changes:
+1. Add brin_checkpoints_timestamp on conversation_checkpoints (timestamp)
+2. Add brin_conversation_messages_timestamp on conversation_messages (timestamp)
+
+Rows are appended in timestamp order, so a BRIN index serves global range
+scans such as the retention cleanup (WHERE timestamp < cutoff) at a fraction
+of a B-tree's size. Per-conversation lookups keep using the composite
+B-tree indexes.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "53"
+down_revision: str | None = "52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create BRIN indexes on the timestamp columns."""
+    op.create_index(
+        "brin_checkpoints_timestamp",
+        "conversation_checkpoints",
+        ["timestamp"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 128},
+    )
+    op.create_index(
+        "brin_conversation_messages_timestamp",
+        "conversation_messages",
+        ["timestamp"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 128},
+    )
+
+
+def downgrade() -> None:
+    """Drop the BRIN indexes."""
+    op.drop_index(
+        "brin_conversation_messages_timestamp", table_name="conversation_messages"
+    )
+    op.drop_index("brin_checkpoints_timestamp", table_name="conversation_checkpoints")
@@ -0,0 +1,75 @@
+"""Store checkpoint_id as native UUID on conversation persistence tables
+
+Revision ID: 54
+Revises: 53
+
+Changes:
+1. ALTER checkpoint_id from VARCHAR(256) to UUID on conversation_checkpoints,
+   conversation_messages and agent_state_snapshots
+
+A UUID is 16 bytes against 36+ bytes of text, which roughly halves the size of
+every index keyed on checkpoint_id. conversation_id keeps its text type because
+it carries application thread ids, which are not UUIDs. The LangGraph tables
+(checkpoints, checkpoint_blobs, checkpoint_writes) are owned by
+AsyncPostgresSaver, which binds these ids as text, so they are left unchanged.
+
+The upgrade aborts with an explicit error if any stored checkpoint_id is not a
+valid UUID instead of silently rewriting data.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "54"
+down_revision: str | None = "53"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ["conversation_checkpoints", "conversation_messages", "agent_state_snapshots"]
+
+UUID_PATTERN = "^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$"
+
+
+def upgrade() -> None:
+    """Convert checkpoint_id columns to UUID."""
+    conn = op.get_bind()
+    for table_name in TABLES:
+        invalid = conn.execute(
+            sa.text(
+                f"SELECT count(*) FROM {table_name} WHERE checkpoint_id !~ :pattern"
+            ),
+            {"pattern": UUID_PATTERN},
+        ).scalar()
+        if invalid:
+            raise RuntimeError(
+                f"{table_name} has {invalid} checkpoint_id values that are not UUIDs; "
+                "clean them up before running this migration"
+            )
+
+    for table_name in TABLES:
+        op.alter_column(
+            table_name,
+            "checkpoint_id",
+            type_=postgresql.UUID(as_uuid=True),
+            existing_type=sa.String(length=256),
+            existing_nullable=False,
+            postgresql_using="checkpoint_id::uuid",
+        )
+
+
+def downgrade() -> None:
+    """Convert checkpoint_id columns back to VARCHAR(256)."""
+    for table_name in TABLES:
+        op.alter_column(
+            table_name,
+            "checkpoint_id",
+            type_=sa.String(length=256),
+            existing_type=postgresql.UUID(as_uuid=True),
+            existing_nullable=False,
+            postgresql_using="checkpoint_id::text",
+        )
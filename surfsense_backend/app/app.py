@@ -1,30 +1,33 @@
+import asyncio
 from contextlib import asynccontextmanager
 import logging
 import os
-import subprocess
 import traceback
 
-from cachetools import TTLCache
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi_csrf_protect.exceptions import CsrfProtectError
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from app.config import config
-from app.config.jsonata_templates import CONNECTOR_TEMPLATES
-from app.db import SiteConfiguration, User, create_db_and_tables, get_async_session
+from app.db import (
+    User,
+    create_db_and_tables,
+    get_async_session,
+    is_schema_current,
+)
 from app.dependencies.limiter import limiter
+from app.middleware.cors import OriginSetCORSMiddleware
 from app.routes import router as crud_router
-from app.schemas import UserCreate, UserRead, UserUpdate
+from app.routes.site_configuration_routes import is_registration_disabled
+from app.schemas import UserCreate, UserRead, UserUpdate, VerifyTokenResponse
 from app.services.jsonata_transformer import transformer
 from app.users import SECRET, auth_backend, current_active_user, fastapi_users
-from app.utils.logger import configure_logging, get_logger
+from app.utils.logger import LazyLogValue, configure_logging, get_logger
 from app.utils.sensitive_data_filter import sanitize_data, sanitize_exception_message
 
 # Configure structured logging at startup
@@ -34,48 +37,74 @@ configure_logging(LOG_LEVEL)
 logger = get_logger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Not needed if you setup a migration system like Alembic
-    await create_db_and_tables()
+# Set to "true"/"false" to skip the startup ffmpeg probe, e.g. in images
+# where ffmpeg is known to be present or absent.
+FFMPEG_AVAILABLE_ENV = "FFMPEG_AVAILABLE"
+
+
+async def _prepare_schema() -> None:
+    # Only run the DDL path when the schema is behind the expected Alembic head;
+    # warm restarts against a migrated database skip it with a single SELECT.
+    if await is_schema_current():
+        logger.info("schema_current_skipping_ddl")
+    else:
+        await create_db_and_tables()
+
+
+async def _check_ffmpeg() -> None:
+    """Check ffmpeg availability for YouTube audio extraction without blocking the loop."""
+    cached = os.getenv(FFMPEG_AVAILABLE_ENV)
+    problem = "ffmpeg not found"
+    if cached is not None:
+        available = cached.lower() == "true"
+    else:
+        available = False
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-version",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            try:
+                # Longer timeout prevents false negatives on slow systems or during high load
+                returncode = await asyncio.wait_for(proc.wait(), timeout=10)
+            except TimeoutError:
+                proc.kill()
+                # Reap the killed process so it does not linger as a zombie
+                await proc.wait()
+                logger.warning("ffmpeg version check timed out after 10 seconds")
+                return
+            available = returncode == 0
+            if not available:
+                problem = f"ffmpeg check failed with exit code {returncode}"
+        except FileNotFoundError:
+            pass
+
+    if available:
+        logger.info("ffmpeg detected successfully - YouTube videos without subtitles can use audio transcription")
+    else:
+        logger.warning(
+            f"{problem} - YouTube videos without subtitles will fail. "
+            "Install ffmpeg to enable audio transcription fallback."
+        )
 
-    # Register JSONata transformation templates for connectors
-    for connector_type, template in CONNECTOR_TEMPLATES.items():
-        transformer.register_template(connector_type, template)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # JSONata connector templates are compiled when the transformer is imported
     logger.info(
         "jsonata_templates_registered",
-        template_count=len(CONNECTOR_TEMPLATES),
-        connectors=list(CONNECTOR_TEMPLATES.keys()),
+        template_count=len(transformer.templates),
+        connectors=transformer.list_templates(),
     )
 
-    # Task 2: Check ffmpeg availability for YouTube audio extraction
-    try:
-        result = subprocess.run(
-            ["ffmpeg", "-version"],
-            capture_output=True,
-            check=True,
-            timeout=10  # Longer timeout prevents false negatives on slow systems or during high load
-        )
-        logger.info("ffmpeg detected successfully - YouTube videos without subtitles can use audio transcription")
-    except FileNotFoundError:
-        logger.warning(
-            "ffmpeg not found - YouTube videos without subtitles will fail. "
-            "Install ffmpeg to enable audio transcription fallback."
-        )
-    except subprocess.CalledProcessError as e:
-        logger.warning(f"ffmpeg check failed: {e}")
-    except subprocess.TimeoutExpired:
-        logger.warning("ffmpeg version check timed out after 10 seconds")
+    # Schema preparation and the ffmpeg probe are independent I/O; overlap them
+    await asyncio.gather(_prepare_schema(), _check_ffmpeg())
 
     yield
 
 
-# Cache for site configuration (TTL = 60 seconds, max 1 item)
-# Reduces database load by caching the registration status check
-_site_config_cache = TTLCache(maxsize=1, ttl=60)
-
-
 async def registration_allowed(session: AsyncSession = Depends(get_async_session)):
     # Check environment variable first (fast check)
     if not config.REGISTRATION_ENABLED:
@@ -84,26 +113,8 @@ async def registration_allowed(session: AsyncSession = Depends(get_async_session
             detail="Registration is disabled by system configuration"
         )
 
-    # Check cache first before hitting database
-    cache_key = "site_config_disable_registration"
-    if cache_key in _site_config_cache:
-        disable_registration = _site_config_cache[cache_key]
-        if disable_registration:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Registration is currently disabled. Please contact the administrator if you need access."
-            )
-        return True
-
-    # Cache miss - query database
-    result = await session.execute(select(SiteConfiguration).where(SiteConfiguration.id == 1))
-    site_config = result.scalar_one_or_none()
-
-    # Cache the result (will expire after 60 seconds)
-    disable_registration = site_config.disable_registration if site_config else False
-    _site_config_cache[cache_key] = disable_registration
-
-    if disable_registration:
+    # Site-level toggle, cached in-process to avoid a SELECT per request
+    if await is_registration_disabled(session):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Registration is currently disabled. Please contact the administrator if you need access."
@@ -112,7 +123,7 @@ async def registration_allowed(session: AsyncSession = Depends(get_async_session
     return True
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Register shared rate limiter with FastAPI app
 app.state.limiter = limiter
@@ -129,7 +140,7 @@ async def csrf_protect_exception_handler(request: Request, exc: CsrfProtectError
         exc: The CSRF protection exception
 
     Returns:
-        JSONResponse with CSRF error (no internal details exposed)
+        ORJSONResponse with CSRF error (no internal details exposed)
     """
     # Log detailed error server-side only
     logger.warning(
@@ -142,7 +153,7 @@ async def csrf_protect_exception_handler(request: Request, exc: CsrfProtectError
     )
 
     # Return generic error to user (no implementation details)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_403_FORBIDDEN,
         content={
             "error": "CSRF validation failed",
@@ -151,6 +162,10 @@ async def csrf_protect_exception_handler(request: Request, exc: CsrfProtectError
     )
 
 
+def _format_traceback(exc: BaseException) -> str:
+    return "".join(traceback.format_exception(exc))
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """
@@ -163,22 +178,23 @@ async def global_exception_handler(request: Request, exc: Exception):
         exc: The exception that was raised
 
     Returns:
-        JSONResponse with user-friendly error message
+        ORJSONResponse with user-friendly error message
     """
     # Log full error details (server-side only) with sanitization
+    # Sanitization and traceback formatting only run if the record is emitted
     logger.error(
         "Unhandled exception",
         extra={
             "path": str(request.url),
             "method": request.method,
             "error_type": type(exc).__name__,
-            "error_message": sanitize_exception_message(str(exc)),
-            "traceback": traceback.format_exc()
+            "error_message": LazyLogValue(sanitize_exception_message, exc),
+            "traceback": LazyLogValue(_format_traceback, exc),
         }
     )
 
     # Return generic error to user (no stack trace exposure)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal server error",
@@ -197,19 +213,19 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         exc: The validation exception
 
     Returns:
-        JSONResponse with validation errors
+        ORJSONResponse with validation errors
     """
     # Log validation errors with sanitization (may contain sensitive user input)
     logger.warning(
         "Request validation failed",
         extra={
             "path": str(request.url),
-            "errors": sanitize_data(exc.errors())
+            "errors": LazyLogValue(sanitize_data, exc.errors()),
         }
     )
 
     # Return user-friendly validation errors
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": "Validation error",
@@ -235,7 +251,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 #
 # REQUEST FLOW (top to bottom):
 # 1. ProxyHeadersMiddleware - Detects HTTPS from X-Forwarded-Proto (MUST be first!)
-# 2. CORSMiddleware - Validates origin and handles preflight OPTIONS requests
+# 2. OriginSetCORSMiddleware - Validates origin and handles preflight OPTIONS requests
 # 3. SecurityHeadersMiddleware - Adds security headers (HSTS, CSP, etc.)
 # 4. SlidingSessionMiddleware - Refreshes auth cookie based on token expiration
 # 5. Rate limiter - Enforces rate limits (registered separately with exception handler)
@@ -244,7 +260,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 # 5. Rate limiter sets rate limit headers
 # 4. SlidingSessionMiddleware refreshes cookie if needed
 # 3. SecurityHeadersMiddleware adds security headers
-# 2. CORSMiddleware adds CORS headers
+# 2. OriginSetCORSMiddleware adds CORS headers
 # 1. ProxyHeadersMiddleware completes
 #
 # WHY THIS ORDER:
@@ -263,10 +279,20 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 # Set TRUSTED_HOSTS env var to comma-separated list of trusted proxy IPs/hosts
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=config.TRUSTED_HOSTS)
 
+# Reject oversized AI assist bodies by Content-Length before they are parsed.
+# Added before CORS so the 413 still carries CORS headers for the browser.
+from app.middleware.body_size import BodySizeLimitMiddleware
+from app.routes.assist import MAX_REQUEST_BODY_BYTES
+
+app.add_middleware(
+    BodySizeLimitMiddleware, limits={"/api/v1/assist": MAX_REQUEST_BODY_BYTES}
+)
+
 # Add CORS middleware
 # SECURITY: Restrict to specific methods and headers for better security
+# Origins are frozen into a set at startup so the per-request check is O(1)
 app.add_middleware(
-    CORSMiddleware,
+    OriginSetCORSMiddleware,
     allow_origins=config.CORS_ORIGINS,  # Configurable via CORS_ORIGINS env var
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
@@ -284,7 +310,6 @@ app.add_middleware(
 # Adds security headers to all responses to protect against common web vulnerabilities
 from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.middleware.session_refresh import SlidingSessionMiddleware
-from app.users import SECRET
 
 app.add_middleware(
     SecurityHeadersMiddleware,
@@ -294,8 +319,7 @@ app.add_middleware(
 
 # Add sliding session middleware
 # Refreshes auth cookie on each request to implement sliding expiration
-# Requires JWT secret key for token decoding and expiration checks
-app.add_middleware(SlidingSessionMiddleware, secret_key=SECRET)
+app.add_middleware(SlidingSessionMiddleware)
 
 app.include_router(
     fastapi_users.get_auth_router(auth_backend), prefix="/auth/jwt", tags=["auth"]
@@ -371,10 +395,10 @@ from app.routes.health_routes import router as health_router
 app.include_router(health_router)
 
 
-@app.get("/verify-token")
+@app.get("/verify-token", response_model=VerifyTokenResponse)
 async def verify_token(
     user: User = Depends(current_active_user),
-):
+) -> VerifyTokenResponse:
     """
     Verify JWT token and return user information.
 
@@ -400,15 +424,4 @@ async def verify_token(
         is_superuser=user.is_superuser,
     )
 
-    return {
-        "valid": True,
-        "user": {
-            "id": str(user.id),
-            "email": user.email,
-            "is_active": user.is_active,
-            "is_superuser": user.is_superuser,
-            "is_verified": user.is_verified,
-            "pages_limit": user.pages_limit,
-            "pages_used": user.pages_used,
-        }
-    }
+    return VerifyTokenResponse(valid=True, user=UserRead.model_validate(user))
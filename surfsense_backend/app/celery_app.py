@@ -63,6 +63,7 @@ celery_app = Celery(
         "app.tasks.celery_tasks.podcast_tasks",
         "app.tasks.celery_tasks.connector_tasks",
         "app.tasks.celery_tasks.schedule_checker_task",
+        "app.tasks.celery_tasks.checkpoint_retention_task",
     ],
 )
 
@@ -106,4 +107,10 @@ celery_app.conf.beat_schedule = {
             "expires": 30,  # Task expires after 30 seconds if not picked up
         },
     },
+    # Nightly: pre-create upcoming conversation_messages partitions and drop
+    # partitions that have fallen out of the checkpoint retention window
+    "maintain-checkpoint-retention": {
+        "task": "maintain_checkpoint_retention",
+        "schedule": crontab(minute="15", hour="3"),
+    },
 }
@@ -0,0 +1,200 @@
+"""Persistence configuration for message checkpointer.
+
+Configures database connections, session management, and cleanup policies
+for storing conversation history and agent state.
+"""
+
+import logging
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+# DATABASE_URL query flag marking a pgbouncer (transaction pooling) endpoint
+PGBOUNCER_URL_PARAM = "pgbouncer"
+
+
+@dataclass(frozen=True, slots=True)
+class PersistenceConfig:
+    """Configuration settings for message persistence layer.
+
+    Instances are immutable; the SQLAlchemy engine URL and keyword arguments
+    are derived once at construction and exposed via ``engine_url`` and
+    ``engine_kwargs``. Append ``?pgbouncer=true`` to the database URL when
+    connecting through pgbouncer in transaction mode.
+    """
+    
+    # Database connection
+    database_url: str
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30.0
+    pool_recycle: int = 3600
+    
+    # Cleanup policies
+    checkpoint_retention_days: int = 30
+    max_checkpoints_per_conversation: int = 100
+    cleanup_batch_size: int = 1000
+    
+    # Performance settings
+    enable_connection_pooling: bool = True
+    enable_query_cache: bool = True
+    cache_ttl_seconds: int = 3600
+
+    # Derived in __post_init__; excluded from init, repr, eq and hash
+    _engine_url: str = field(init=False, repr=False, compare=False)
+    _behind_pgbouncer: bool = field(init=False, repr=False, compare=False)
+    _engine_kwargs: Mapping[str, Any] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """Validate configuration after initialization."""
+        if not self.database_url:
+            raise ValueError("database_url is required")
+        if self.pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        if self.checkpoint_retention_days < 1:
+            raise ValueError("checkpoint_retention_days must be at least 1")
+        engine_url, behind_pgbouncer = _strip_pgbouncer_flag(self.database_url)
+        object.__setattr__(self, "_engine_url", engine_url)
+        object.__setattr__(self, "_behind_pgbouncer", behind_pgbouncer)
+        object.__setattr__(self, "_engine_kwargs", self._build_engine_kwargs())
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("PersistenceConfig initialized with database_url=%s",
+                       self.database_url[:20] + "...")
+
+    def _build_engine_kwargs(self) -> Mapping[str, Any]:
+        if self._behind_pgbouncer:
+            # pgbouncer already pools connections; avoid pooling twice
+            return MappingProxyType({
+                "poolclass": NullPool,
+                "connect_args": self.connect_args,
+            })
+        if not self.enable_connection_pooling:
+            return MappingProxyType({"poolclass": NullPool})
+        return MappingProxyType({
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": True,
+        })
+
+    @property
+    def engine_url(self) -> str:
+        """Database URL for ``create_async_engine`` with the pgbouncer flag removed."""
+        return self._engine_url
+
+    @property
+    def behind_pgbouncer(self) -> bool:
+        """Whether the database URL points at a pgbouncer endpoint."""
+        return self._behind_pgbouncer
+
+    @property
+    def connect_args(self) -> dict[str, Any]:
+        """asyncpg connect arguments; only non-empty behind pgbouncer.
+
+        In transaction mode a server connection can change between
+        statements, so asyncpg's prepared statement caches must be disabled.
+        """
+        if not self._behind_pgbouncer:
+            return {}
+        return {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    @property
+    def engine_kwargs(self) -> Mapping[str, Any]:
+        """Keyword arguments for ``create_async_engine`` derived from this config."""
+        return self._engine_kwargs
+
+
+def _strip_pgbouncer_flag(database_url: str) -> tuple[str, bool]:
+    """Remove the pgbouncer query flag from a URL and report whether it was set."""
+    parts = urlsplit(database_url)
+    if not parts.query:
+        return database_url, False
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    remaining = [(key, value) for key, value in query if key != PGBOUNCER_URL_PARAM]
+    if len(remaining) == len(query):
+        return database_url, False
+    enabled = any(
+        key == PGBOUNCER_URL_PARAM and value.lower() in ("1", "true", "yes")
+        for key, value in query
+    )
+    return urlunsplit(parts._replace(query=urlencode(remaining))), enabled
+
+
+def get_persistence_config() -> PersistenceConfig:
+    """Load persistence configuration from environment variables.
+    
+    Returns:
+        PersistenceConfig: Configured persistence settings
+        
+    Raises:
+        ValueError: If required environment variables are missing
+    """
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable is required")
+    
+    config = PersistenceConfig(
+        database_url=database_url,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30.0")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+        checkpoint_retention_days=int(os.getenv("CHECKPOINT_RETENTION_DAYS", "30")),
+        max_checkpoints_per_conversation=int(os.getenv("MAX_CHECKPOINTS", "100")),
+        cleanup_batch_size=int(os.getenv("CLEANUP_BATCH_SIZE", "1000")),
+        enable_connection_pooling=os.getenv("ENABLE_DB_POOLING", "true").lower() == "true",
+        enable_query_cache=os.getenv("ENABLE_QUERY_CACHE", "true").lower() == "true",
+        cache_ttl_seconds=int(os.getenv("CACHE_TTL_SECONDS", "3600")),
+    )
+    
+    logger.info("Persistence configuration loaded successfully")
+    return config
+
+
+# Process-wide configuration instance. A plain module global rather than a
+# ContextVar: threads, ThreadPoolExecutor workers and run_in_executor() calls
+# start with an empty context, so they would never see a ContextVar set at
+# startup.
+_persistence_config: PersistenceConfig | None = None
+
+
+def initialize_config(config: PersistenceConfig | None = None) -> PersistenceConfig:
+    """Initialize global persistence configuration.
+    
+    Args:
+        config: Configuration instance. If None, loads from environment.
+        
+    Returns:
+        PersistenceConfig: The initialized configuration
+    """
+    global _persistence_config
+    if config is None:
+        config = get_persistence_config()
+    _persistence_config = config
+    logger.info("Persistence configuration initialized")
+    return config
+
+
+def get_config() -> PersistenceConfig:
+    """Get the global persistence configuration instance.
+    
+    Returns:
+        PersistenceConfig: The configured persistence settings
+        
+    Raises:
+        RuntimeError: If configuration has not been initialized
+    """
+    if _persistence_config is None:
+        raise RuntimeError("Persistence configuration has not been initialized. "
+                          "Call initialize_config() first.")
+    return _persistence_config
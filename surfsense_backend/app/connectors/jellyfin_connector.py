@@ -3,13 +3,17 @@
 Jellyfin connector for media library access.
 """
 
+import asyncio
+import ipaddress
 import logging
+import random
+from collections.abc import AsyncIterator
+from typing import Any
 from urllib.parse import urlparse
-import ipaddress
 
+import httpcore
 import httpx
-
-from app.utils.url_validator import format_ip_for_url
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +21,144 @@ logger = logging.getLogger(__name__)
 # 10,000,000 ticks = 1 second, so 600,000,000 ticks = 1 minute
 JELLYFIN_TICKS_PER_MINUTE = 600_000_000
 
+# Retry policy for transient failures: exponential backoff with full jitter
+RETRY_BACKOFF_BASE = 0.25
+RETRY_BACKOFF_CAP = 8.0
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+# Library items are fetched in pages of this size so no single response
+# holds the whole library
+ITEMS_PAGE_SIZE = 200
+
+# Query parameters shared by every call of a given kind; each call copies
+# these and only adds its variable keys
+_ITEM_FIELDS = (
+    "Overview,Genres,Studios,People,ProviderIds,DateCreated,PremiereDate,"
+    "ProductionYear,CommunityRating,OfficialRating,RunTimeTicks"
+)
+_USER_ITEM_FIELDS = (
+    "Overview,Genres,Studios,DateCreated,PremiereDate,ProductionYear,CommunityRating"
+)
+_BASE_ITEM_PARAMS = {
+    "Recursive": "true",
+    "Fields": _ITEM_FIELDS,
+    "SortBy": "DateCreated",
+    "SortOrder": "Descending",
+}
+_FAVORITES_PARAMS = {
+    "Recursive": "true",
+    "Filters": "IsFavorite",
+    "Fields": _USER_ITEM_FIELDS,
+    "SortBy": "DateCreated",
+    "SortOrder": "Descending",
+}
+_RECENTLY_PLAYED_PARAMS = {
+    "Recursive": "true",
+    "Filters": "IsPlayed",
+    "Fields": _USER_ITEM_FIELDS,
+    "SortBy": "DatePlayed",
+    "SortOrder": "Descending",
+}
+
+
+# Markdown layout per item type; optional lines are pre-rendered by _kv and
+# collapse to empty strings when the field is missing
+_DEFAULT_TEMPLATE = (
+    "# {name}\n{year}**Type:** {type}\n{status}{rating}{score}{runtime}{genres}"
+    "{studios}{overview}{people}"
+)
+_EPISODE_TEMPLATE = (
+    "# {name}\n{year}**Type:** {type}\n{status}{rating}{score}{runtime}{genres}"
+    "{studios}{series}{episode}{overview}{people}"
+)
+_MUSIC_TEMPLATE = (
+    "# {name}\n{year}**Type:** {type}\n{status}{rating}{score}{runtime}{genres}"
+    "{studios}{album}{artists}{overview}{people}"
+)
+ITEM_SEPARATOR = "\n\n---\n\n"
+_MUSIC_TYPES = frozenset({"Audio", "MusicAlbum"})
+_MARKDOWN_TEMPLATES = {
+    "Episode": _EPISODE_TEMPLATE,
+    "Audio": _MUSIC_TEMPLATE,
+    "MusicAlbum": _MUSIC_TEMPLATE,
+}
+_STATUS_LINES = {
+    "favorite": "**Status:** Favorite\n",
+    "recently_played": "**Status:** Recently Played\n",
+}
+
+
+def _kv(label: str, value) -> str:
+    """Render a '**label:** value' markdown line, or nothing for an empty value."""
+    return f"**{label}:** {value}\n" if value else ""
+
+
+class _PinnedHostBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that dials a pre-validated IP for the connector's host.
+
+    Resolution happens once in validate_connector_url(); connecting by
+    hostname here would let a DNS rebind swap in a private address between
+    validation and use. Any other host is refused outright.
+
+    Hosts are compared in IDNA form: urlparse() yields the Unicode hostname,
+    while httpcore dials the ASCII "xn--" form httpx sends on the wire.
+    """
+
+    def __init__(self, hostname: str, pinned_ip: str):
+        self._hostname = hostname.encode("idna").lower()
+        self._pinned_ip = pinned_ip
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        if host.encode("idna").lower() != self._hostname:
+            raise httpcore.ConnectError(f"Refusing to connect to unpinned host {host!r}")
+        return await self._backend.connect_tcp(
+            self._pinned_ip,
+            port,
+            timeout=timeout,
+            local_address=local_address,
+            socket_options=socket_options,
+        )
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options=None
+    ) -> httpcore.AsyncNetworkStream:
+        raise httpcore.ConnectError("Unix sockets are not allowed for Jellyfin")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _PinnedHostTransport(httpx.AsyncHTTPTransport):
+    """
+    HTTP/2-capable transport whose connection pool dials through
+    _PinnedHostBackend.
+
+    httpx has no network_backend option, so the httpcore pool is built here
+    with the same settings AsyncHTTPTransport would use.
+    """
+
+    def __init__(self, hostname: str, pinned_ip: str, limits: httpx.Limits):
+        ssl_context = httpx.create_ssl_context()
+        super().__init__(verify=ssl_context, http2=True, limits=limits)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=True,
+            network_backend=_PinnedHostBackend(hostname, pinned_ip),
+        )
+
 
 class JellyfinConnector:
     """Connector for Jellyfin media server API."""
@@ -43,7 +185,7 @@ class JellyfinConnector:
                           REQUIRED for security - obtain from validate_connector_url()
 
         Raises:
-            ValueError: If validated_ips is not provided
+            ValueError: If validated_ips is not provided or is not a public IP
         """
         # SECURITY: Require validated IPs to prevent SSRF attacks
         # Callers must use validate_connector_url() before creating connector
@@ -61,24 +203,38 @@ class JellyfinConnector:
             "X-Emby-Token": api_key,
             "Content-Type": "application/json",
         }
+        self._pinned_ip = self._validate_pinned_ip()
+
+        # One client per connector so every call shares the keep-alive pool
+        # instead of paying a new TCP/TLS handshake per request. HTTP/2 lets
+        # concurrent requests multiplex over that single connection when the
+        # server (or its reverse proxy) negotiates it.
+        #
+        # Requests address the real hostname, so the pool keys connections by
+        # host and TLS SNI/certificate checks use it, while the transport
+        # dials the pinned IP (DNS rebinding / TOCTOU protection).
+        transport = _PinnedHostTransport(
+            urlparse(self.server_url).hostname,
+            self._pinned_ip,
+            httpx.Limits(max_keepalive_connections=10),
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.server_url,
+            headers=self.headers,
+            transport=transport,
+            timeout=60.0,
+        )
 
-    def _build_url(self, endpoint: str) -> tuple[str, dict[str, str]]:
+    def _validate_pinned_ip(self) -> str:
         """
-        Build request URL and headers, using validated IPs.
-
-        Args:
-            endpoint: API endpoint path
+        Validate the server URL scheme and the pinned IP once.
 
         Returns:
-            Tuple of (url, headers_dict)
+            The IP address every connection is dialled to
 
         Raises:
-            ValueError: If validated_ips is missing (should be caught in __init__)
+            ValueError: If the scheme is unsupported or the IP is invalid or non-public
         """
-        if not self.validated_ips:
-            # Should be unreachable due to __init__ check, but required for static analysis safety
-            raise ValueError("Security Error: No validated IPs available for SSRF protection")
-
         parsed = urlparse(self.server_url)
 
         # SECURITY: Only allow http/https schemes to avoid SSRF via other protocols
@@ -95,47 +251,118 @@ class JellyfinConnector:
         if ip_obj.is_private or ip_obj.is_loopback or ip_obj.is_link_local:
             raise ValueError(f"Refusing to connect to non-public IP address: {raw_ip!r}")
 
-        # Use first validated IP as connection target, formatted for URL (handles IPv6)
-        ip_formatted = format_ip_for_url(raw_ip)
+        return str(ip_obj)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its connection pool."""
+        await self._client.aclose()
 
-        # Reconstruct URL with IP
-        url = f"{parsed.scheme}://{ip_formatted}"
-        if parsed.port:
-            url += f":{parsed.port}"
-        url += endpoint
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
 
-        # Set Host header for virtual hosting/TLS SNI
-        headers = self.headers.copy()
-        headers["Host"] = parsed.hostname
-        return url, headers
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: dict | None = None,
+        timeout: float = 30.0,
+        max_retries: int = 4,
+    ) -> httpx.Response:
+        """
+        Send a request to the server, retrying transient failures.
+
+        Transport errors and 502/503/504 responses are retried up to
+        max_retries times, sleeping a random delay between zero and
+        min(cap, base * 2**attempt) so concurrent indexers don't retry in
+        lockstep.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Optional query parameters
+            timeout: Per-attempt timeout in seconds
+            max_retries: Number of retries after the first attempt
+
+        Returns:
+            The final response, which may still carry a retryable status
+
+        Raises:
+            httpx.TransportError: If the last attempt fails at the transport level
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.request(
+                    method, endpoint, params=params, timeout=timeout
+                )
+            except httpx.TransportError as e:
+                if attempt >= max_retries:
+                    raise
+                logger.debug(f"Jellyfin {method} {endpoint} failed ({e!s}), retrying")
+            else:
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt >= max_retries
+                ):
+                    return response
+                logger.debug(
+                    f"Jellyfin {method} {endpoint} returned {response.status_code}, retrying"
+                )
+            await asyncio.sleep(
+                random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2**attempt))
+            )
+            attempt += 1
+
+    @staticmethod
+    def _handle(
+        response: httpx.Response, entity: str, ok_key: str | None = None
+    ) -> tuple[Any, str | None]:
+        """
+        Decode a Jellyfin response into the (data, error) pair the API methods return.
+
+        Args:
+            response: Response from _request()
+            entity: What was requested, used in the error message
+            ok_key: Optional top-level key to extract from a successful payload
+
+        Returns:
+            Tuple of (decoded_data_or_none, error_message_or_none)
+        """
+        status = response.status_code
+        if status == 200:
+            data = orjson.loads(response.content)
+            return (data.get(ok_key, []) if ok_key else data), None
+        if status == 401:
+            return None, "Invalid API key"
+        return None, f"Failed to get {entity}: {status}"
 
     async def test_connection(self) -> tuple[bool, str | None]:
         """
         Test the connection to Jellyfin server.
 
+        Makes a single attempt so a user validating a bad URL gets an answer
+        quickly instead of waiting through the retry backoff.
+
         Returns:
             Tuple of (success, error_message)
         """
         try:
-            url, headers = self._build_url("/System/Info")
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    info = response.json()
-                    server_name = info.get("ServerName", "Unknown")
-                    version = info.get("Version", "Unknown")
-                    logger.info(
-                        f"Connected to Jellyfin server: {server_name} v{version}"
-                    )
-                    return True, None
-                elif response.status_code == 401:
-                    return False, "Invalid API key"
-                else:
-                    return False, f"Server returned status {response.status_code}"
+            response = await self._request("GET", "/System/Info", max_retries=0)
+
+            info, error = self._handle(response, "server info")
+            if error:
+                return False, error
+
+            server_name = info.get("ServerName", "Unknown")
+            version = info.get("Version", "Unknown")
+            logger.info(f"Connected to Jellyfin server: {server_name} v{version}")
+            return True, None
 
         except httpx.ConnectError as e:
             return False, f"Connection failed: {e!s}"
@@ -144,29 +371,21 @@ class JellyfinConnector:
         except Exception as e:
             return False, f"Unexpected error: {e!s}"
 
-    async def get_server_info(self) -> tuple[dict | None, str | None]:
+    async def get_server_info(
+        self, max_retries: int = 4
+    ) -> tuple[dict | None, str | None]:
         """
         Retrieve server information from the Jellyfin server.
 
+        Args:
+            max_retries: Number of retries after the first attempt
+
         Returns:
             Tuple of (info_dict_or_none, error_message_or_none)
         """
         try:
-            url, headers = self._build_url("/System/Info")
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(url, headers=headers)
-            
-
-            if response.status_code == 200:
-                return response.json(), None
-            elif response.status_code == 401:
-                return None, "Invalid API key"
-            else:
-                return None, f"Server returned status {response.status_code}"
+            response = await self._request("GET", "/System/Info", max_retries=max_retries)
+            return self._handle(response, "server info")
 
         except httpx.ConnectError as e:
             return None, f"Connection failed: {e!s}"
@@ -183,17 +402,9 @@ class JellyfinConnector:
             Tuple of (users_list, error_message)
         """
         try:
-            url, headers = self._build_url("/Users")
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    return response.json(), None
-                else:
-                    return [], f"Failed to get users: {response.status_code}"
+            response = await self._request("GET", "/Users")
+            users, error = self._handle(response, "users")
+            return users or [], error
 
         except Exception as e:
             return [], f"Error getting users: {e!s}"
@@ -206,29 +417,22 @@ class JellyfinConnector:
             Tuple of (libraries_list, error_message)
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if self.user_id:
-                    endpoint = f"/Users/{self.user_id}/Views"
-                else:
-                    endpoint = "/Library/VirtualFolders"
-
-                url, headers = self._build_url(endpoint)
-
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    # Handle different response formats
-                    if isinstance(data, dict) and "Items" in data:
-                        return data["Items"], None
-                    elif isinstance(data, list):
-                        return data, None
-                    return [], None
-                else:
-                    return [], f"Failed to get libraries: {response.status_code}"
+            if self.user_id:
+                endpoint = f"/Users/{self.user_id}/Views"
+            else:
+                endpoint = "/Library/VirtualFolders"
+
+            response = await self._request("GET", endpoint)
+            data, error = self._handle(response, "libraries")
+            if error:
+                return [], error
+
+            # Handle different response formats
+            if isinstance(data, dict) and "Items" in data:
+                return data["Items"], None
+            elif isinstance(data, list):
+                return data, None
+            return [], None
 
         except Exception as e:
             return [], f"Error getting libraries: {e!s}"
@@ -255,47 +459,75 @@ class JellyfinConnector:
             Tuple of (items_list, total_count, error_message)
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                params = {
-                    "Limit": limit,
-                    "StartIndex": start_index,
-                    "Recursive": "true",
-                    "Fields": "Overview,Genres,Studios,People,ProviderIds,DateCreated,PremiereDate,ProductionYear,CommunityRating,OfficialRating,RunTimeTicks",
-                    "SortBy": "DateCreated",
-                    "SortOrder": "Descending",
-                }
-
-                if parent_id:
-                    params["ParentId"] = parent_id
-
-                if include_item_types:
-                    params["IncludeItemTypes"] = include_item_types
-                elif item_types:
-                    params["IncludeItemTypes"] = ",".join(item_types)
-
-                if self.user_id:
-                    endpoint = f"/Users/{self.user_id}/Items"
-                else:
-                    endpoint = "/Items"
-
-                url, headers = self._build_url(endpoint)
-
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(url, headers=headers, params=params)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    items = data.get("Items", [])
-                    total = data.get("TotalRecordCount", len(items))
-                    return items, total, None
-                else:
-                    return [], 0, f"Failed to get items: {response.status_code}"
+            params = {**_BASE_ITEM_PARAMS, "Limit": limit, "StartIndex": start_index}
+
+            if parent_id:
+                params["ParentId"] = parent_id
+
+            if include_item_types:
+                params["IncludeItemTypes"] = include_item_types
+            elif item_types:
+                params["IncludeItemTypes"] = ",".join(item_types)
+
+            endpoint = f"/Users/{self.user_id}/Items" if self.user_id else "/Items"
+
+            response = await self._request("GET", endpoint, params=params, timeout=60.0)
+            data, error = self._handle(response, "items")
+            if error:
+                return [], 0, error
+
+            items = data.get("Items", [])
+            total = data.get("TotalRecordCount", len(items))
+            return items, total, None
 
         except Exception as e:
             return [], 0, f"Error getting items: {e!s}"
 
+    async def iter_items(
+        self,
+        parent_id: str | None = None,
+        include_item_types: str | None = None,
+        max_items: int | None = None,
+        page_size: int = ITEMS_PAGE_SIZE,
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate library items page by page.
+
+        Only one page is parsed and held at a time, and paging stops as soon
+        as the server returns a short page or max_items is reached.
+
+        Args:
+            parent_id: Parent folder ID to filter by
+            include_item_types: Comma-separated list of item types
+            max_items: Maximum items to yield (None for all)
+            page_size: Items requested per page
+
+        Yields:
+            Item dicts as returned by the Jellyfin API
+
+        Raises:
+            RuntimeError: If a page request fails
+        """
+        start_index = 0
+        while max_items is None or start_index < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - start_index)
+            items, _, error = await self.get_items(
+                parent_id=parent_id,
+                limit=limit,
+                start_index=start_index,
+                include_item_types=include_item_types,
+            )
+            if error:
+                raise RuntimeError(error)
+            for item in items:
+                yield item
+            if len(items) < limit:
+                return
+            start_index += len(items)
+
+    async def _collect_items(self, **kwargs) -> list[dict]:
+        return [item async for item in self.iter_items(**kwargs)]
+
     async def get_favorites(self, limit: int = 100) -> tuple[list[dict], str | None]:
         """
         Get user's favorite items.
@@ -307,24 +539,12 @@ class JellyfinConnector:
             return [], "User ID required for favorites"
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                endpoint = f"/Users/{self.user_id}/Items"
-                url, headers = self._build_url(endpoint)
-
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                )
+            params = {**_FAVORITES_PARAMS, "Limit": limit}
+            endpoint = f"/Users/{self.user_id}/Items"
+            response = await self._request("GET", endpoint, params=params, timeout=60.0)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("Items", []), None
-                else:
-                    return [], f"Failed to get favorites: {response.status_code}"
+            items, error = self._handle(response, "favorites", ok_key="Items")
+            return items or [], error
 
         except Exception as e:
             return [], f"Error getting favorites: {e!s}"
@@ -342,33 +562,13 @@ class JellyfinConnector:
             return [], "User ID required for play history"
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                params = {
-                    "Limit": limit,
-                    "Recursive": "true",
-                    "Filters": "IsPlayed",
-                    "Fields": "Overview,Genres,Studios,DateCreated,PremiereDate,ProductionYear,CommunityRating",
-                    "SortBy": "DatePlayed",
-                    "SortOrder": "Descending",
-                }
-
-                endpoint = f"/Users/{self.user_id}/Items"
-                url, headers = self._build_url(endpoint)
-
-                if not isinstance(url, str) or not url.startswith(("http://", "https://")):
-                    raise ValueError(f"Invalid URL scheme detected: {url}")
-
-                response = await client.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                )
+            params = {**_RECENTLY_PLAYED_PARAMS, "Limit": limit}
+
+            endpoint = f"/Users/{self.user_id}/Items"
+            response = await self._request("GET", endpoint, params=params, timeout=60.0)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("Items", []), None
-                else:
-                    return [], f"Failed to get play history: {response.status_code}"
+            items, error = self._handle(response, "play history", ok_key="Items")
+            return items or [], error
 
         except Exception as e:
             return [], f"Error getting play history: {e!s}"
@@ -394,52 +594,85 @@ class JellyfinConnector:
         """
         all_items = []
         errors = []
+        # IDs already collected, so favorites/history don't duplicate library items
+        seen_ids: set[str] = set()
 
         # Default item types to index
         if item_types is None:
             item_types = ["Movie", "Series", "Episode", "Audio", "MusicAlbum", "Book", "AudioBook"]
 
-        # Get library items
+        # The library, favorites and play history requests are independent,
+        # so issue them concurrently over the shared client
         include_types = ",".join(item_types)
-        items, total, error = await self.get_items(
-            limit=max_items, include_item_types=include_types
-        )
-        if error:
-            errors.append(f"Library items: {error}")
-        else:
-            for item in items:
-                all_items.append({"data": item, "source": "library"})
-            logger.info(f"Fetched {len(items)} library items (total: {total})")
+        tasks = [
+            self._collect_items(include_item_types=include_types, max_items=max_items)
+        ]
+        if self.user_id:
+            tasks.append(self.get_favorites(limit=max_favorites))
+            tasks.append(self.get_recently_played(limit=max_recently_played))
 
-        # Get favorites if user_id is set
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        library_result = results[0]
+        if not isinstance(library_result, BaseException):
+            library_result = (library_result, None)
+        self._merge_source_items(
+            library_result, "library", "Library items", all_items, seen_ids, errors
+        )
         if self.user_id:
-            favorites, error = await self.get_favorites(limit=max_favorites)
-            if error:
-                errors.append(f"Favorites: {error}")
-            else:
-                # Avoid duplicates
-                existing_ids = {item["data"].get("Id") for item in all_items}
-                for item in favorites:
-                    if item.get("Id") not in existing_ids:
-                        all_items.append({"data": item, "source": "favorite"})
-                logger.info(f"Fetched {len(favorites)} favorites")
-
-            # Get recently played
-            recently_played, error = await self.get_recently_played(
-                limit=max_recently_played
+            self._merge_source_items(
+                results[1], "favorite", "Favorites", all_items, seen_ids, errors
+            )
+            self._merge_source_items(
+                results[2],
+                "recently_played",
+                "Recently played",
+                all_items,
+                seen_ids,
+                errors,
             )
-            if error:
-                errors.append(f"Recently played: {error}")
-            else:
-                existing_ids = {item["data"].get("Id") for item in all_items}
-                for item in recently_played:
-                    if item.get("Id") not in existing_ids:
-                        all_items.append({"data": item, "source": "recently_played"})
-                logger.info(f"Fetched {len(recently_played)} recently played items")
 
         error_message = "; ".join(errors) if errors else None
         return all_items, error_message
 
+    @staticmethod
+    def _merge_source_items(
+        result: tuple[list[dict], str | None] | BaseException,
+        source: str,
+        label: str,
+        all_items: list[dict],
+        seen_ids: set[str],
+        errors: list[str],
+    ) -> None:
+        """
+        Add one source's items to all_items, or record why the source failed.
+
+        Items whose ID was already collected from an earlier source are skipped.
+
+        Args:
+            result: (items, error) from the source, or the exception it raised
+            source: Source tag stored with each item
+            label: Source name used in error and log messages
+            all_items: Collected items, extended in place
+            seen_ids: IDs already collected, updated in place
+            errors: Error messages, extended in place
+        """
+        if isinstance(result, BaseException):
+            errors.append(f"{label}: {result!s}")
+            return
+        items, error = result
+        if error:
+            errors.append(f"{label}: {error}")
+            return
+        for item in items:
+            item_id = item.get("Id")
+            if item_id and item_id in seen_ids:
+                continue
+            if item_id:
+                seen_ids.add(item_id)
+            all_items.append({"data": item, "source": source})
+        logger.info(f"Fetched {len(items)} {label.lower()}")
+
     def format_item_to_markdown(self, item_data: dict) -> str:
         """
         Format a Jellyfin item to markdown for indexing.
@@ -452,88 +685,85 @@ class JellyfinConnector:
         """
         item = item_data.get("data", {})
         source = item_data.get("source", "library")
+        # Bind the lookup once; it is called for every field below
+        get = item.get
 
-        item_type = item.get("Type", "Unknown")
-        name = item.get("Name", "Untitled")
-        overview = item.get("Overview", "")
-        year = item.get("ProductionYear", "")
-        genres = item.get("Genres", [])
-        rating = item.get("CommunityRating", "")
-        official_rating = item.get("OfficialRating", "")
-        studios = item.get("Studios", [])
-        runtime_ticks = item.get("RunTimeTicks", 0)
+        item_type = get("Type", "Unknown")
+        rating = get("CommunityRating", "")
+        studios = get("Studios") or ()
+        runtime_ticks = get("RunTimeTicks", 0)
 
         # Format runtime
         runtime = ""
         if runtime_ticks:
-            minutes = runtime_ticks // JELLYFIN_TICKS_PER_MINUTE
-            hours = minutes // 60
-            mins = minutes % 60
-            if hours:
-                runtime = f"{hours}h {mins}m"
-            else:
-                runtime = f"{mins}m"
-
-        # Build markdown
-        md_parts = [f"# {name}"]
-
-        if year:
-            md_parts.append(f"**Year:** {year}")
-
-        md_parts.append(f"**Type:** {item_type}")
-
-        if source == "favorite":
-            md_parts.append("**Status:** Favorite")
-        elif source == "recently_played":
-            md_parts.append("**Status:** Recently Played")
-
-        if official_rating:
-            md_parts.append(f"**Rating:** {official_rating}")
-
-        if rating:
-            md_parts.append(f"**Community Score:** {rating}/10")
-
-        if runtime:
-            md_parts.append(f"**Runtime:** {runtime}")
-
-        if genres:
-            md_parts.append(f"**Genres:** {', '.join(genres)}")
-
-        if studios:
-            studio_names = [s.get("Name", "") for s in studios if s.get("Name")]
-            if studio_names:
-                md_parts.append(f"**Studios:** {', '.join(studio_names)}")
+            hours, mins = divmod(runtime_ticks // JELLYFIN_TICKS_PER_MINUTE, 60)
+            runtime = f"{hours}h {mins}m" if hours else f"{mins}m"
+
+        fields = {
+            "name": get("Name", "Untitled"),
+            "year": _kv("Year", get("ProductionYear", "")),
+            "type": item_type,
+            "status": _STATUS_LINES.get(source, ""),
+            "rating": _kv("Rating", get("OfficialRating", "")),
+            "score": f"**Community Score:** {rating}/10\n" if rating else "",
+            "runtime": _kv("Runtime", runtime),
+            "genres": _kv("Genres", ", ".join(get("Genres") or ())),
+            "studios": _kv(
+                "Studios", ", ".join(s.get("Name") for s in studios if s.get("Name"))
+            ),
+            "overview": "",
+            "people": "",
+        }
 
         # Add series info for episodes
         if item_type == "Episode":
-            series_name = item.get("SeriesName", "")
-            season_num = item.get("ParentIndexNumber", "")
-            episode_num = item.get("IndexNumber", "")
-            if series_name:
-                md_parts.append(f"**Series:** {series_name}")
-            if season_num and episode_num:
-                md_parts.append(f"**Season/Episode:** S{season_num:02d}E{episode_num:02d}")
+            season_num = get("ParentIndexNumber", "")
+            episode_num = get("IndexNumber", "")
+            fields["series"] = _kv("Series", get("SeriesName", ""))
+            fields["episode"] = (
+                f"**Season/Episode:** S{season_num:02d}E{episode_num:02d}\n"
+                if season_num and episode_num
+                else ""
+            )
 
         # Add album/artist info for music
-        if item_type in ["Audio", "MusicAlbum"]:
-            album = item.get("Album", "")
-            artists = item.get("Artists", [])
-            if album:
-                md_parts.append(f"**Album:** {album}")
-            if artists:
-                md_parts.append(f"**Artists:** {', '.join(artists)}")
+        elif item_type in _MUSIC_TYPES:
+            fields["album"] = _kv("Album", get("Album", ""))
+            fields["artists"] = _kv("Artists", ", ".join(get("Artists") or ()))
 
+        overview = get("Overview", "")
         if overview:
-            md_parts.append(f"\n## Overview\n{overview}")
+            fields["overview"] = f"\n## Overview\n{overview}\n"
 
         # Add people (cast/crew)
-        people = item.get("People", [])
+        people = get("People") or ()
         if people:
-            actors = [p.get("Name") for p in people if p.get("Type") == "Actor"][:5]
-            directors = [p.get("Name") for p in people if p.get("Type") == "Director"]
-            if actors:
-                md_parts.append(f"\n**Cast:** {', '.join(actors)}")
-            if directors:
-                md_parts.append(f"**Director:** {', '.join(directors)}")
-
-        return "\n".join(md_parts)
+            # One pass over the cast, keeping at most five actors
+            actors, directors = [], []
+            for person in people:
+                person_type = person.get("Type")
+                if person_type == "Actor":
+                    if len(actors) < 5:
+                        actors.append(person.get("Name"))
+                elif person_type == "Director":
+                    directors.append(person.get("Name"))
+            cast = f"\n**Cast:** {', '.join(actors)}\n" if actors else ""
+            fields["people"] = cast + _kv("Director", ", ".join(directors))
+
+        template = _MARKDOWN_TEMPLATES.get(item_type, _DEFAULT_TEMPLATE)
+        # Every line ends in a newline; drop the last one
+        return template.format(**fields)[:-1]
+
+    def format_items_to_markdown(self, items_data: list[dict]) -> str:
+        """
+        Format several Jellyfin items into one markdown document.
+
+        Items are separated by horizontal rules and joined once at the end.
+
+        Args:
+            items_data: Items with 'data' and 'source' keys
+
+        Returns:
+            Formatted markdown string
+        """
+        return ITEM_SEPARATOR.join(map(self.format_item_to_markdown, items_data))
@@ -22,10 +22,12 @@ from sqlalchemy import (
     text,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, relationship
 
 from app.config import config
+from app.config.persistence import initialize_config
 from app.retriver.chunks_hybrid_search import ChucksHybridSearchRetriever
 from sqlalchemy import event
 from app.retriver.documents_hybrid_search import DocumentHybridSearchRetriever
@@ -33,6 +35,11 @@ from app.services.encryption_service import encryption_service
 
 DATABASE_URL = config.DATABASE_URL
 
+# Alembic head revision this code expects. When alembic_version already holds
+# this revision the schema is current and startup skips the DDL path entirely.
+# Bump together with every new migration in alembic/versions.
+CURRENT_SCHEMA_VERSION = "54"
+
 
 class DocumentType(str, Enum):
     EXTENSION = "EXTENSION"
@@ -549,7 +556,12 @@ else:
         auto_compress_enabled = Column(Boolean, nullable=False, default=True, server_default="true")
 
 
-engine = create_async_engine(DATABASE_URL)
+# Pool sizing comes from the DB_POOL_* settings; a DATABASE_URL carrying
+# ?pgbouncer=true gets NullPool with asyncpg statement caching disabled
+persistence_config = initialize_config()
+engine = create_async_engine(
+    persistence_config.engine_url, **persistence_config.engine_kwargs
+)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
@@ -584,6 +596,23 @@ async def create_db_and_tables():
     await setup_indexes()
 
 
+async def is_schema_current() -> bool:
+    """Check whether the database is already at CURRENT_SCHEMA_VERSION.
+
+    A single SELECT against alembic_version lets warm restarts skip the
+    CREATE TABLE / CREATE INDEX IF NOT EXISTS round-trips in
+    create_db_and_tables(). A missing alembic_version table (fresh database)
+    counts as not current.
+    """
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            versions = set(result.scalars().all())
+    except SQLAlchemyError:
+        return False
+    return versions == {CURRENT_SCHEMA_VERSION}
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
@@ -4,7 +4,14 @@ Middleware package for SurfSense backend.
 This package contains custom middleware components for the application.
 """
 
+from app.middleware.body_size import BodySizeLimitMiddleware
+from app.middleware.cors import OriginSetCORSMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.middleware.session_refresh import SlidingSessionMiddleware
 
-__all__ = ["SecurityHeadersMiddleware", "SlidingSessionMiddleware"]
+__all__ = [
+    "BodySizeLimitMiddleware",
+    "OriginSetCORSMiddleware",
+    "SecurityHeadersMiddleware",
+    "SlidingSessionMiddleware",
+]
@@ -0,0 +1,45 @@
+"""
+Request body size limit middleware for SurfSense.
+
+Rejects requests whose declared Content-Length exceeds a per-path limit with
+413 before the body is read, so oversized payloads are never JSON-parsed or
+run through Pydantic validators. Bodies sent without a Content-Length still
+reach the route and are bounded by its own field validation.
+"""
+
+from collections.abc import Mapping
+
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """Pure ASGI middleware enforcing maximum body sizes by path prefix."""
+
+    def __init__(self, app: ASGIApp, limits: Mapping[str, int]) -> None:
+        """
+        Args:
+            app: ASGI application
+            limits: Maximum body size in bytes, keyed by path prefix
+        """
+        self.app = app
+        self._limits = tuple(limits.items())
+        self._prefixes = tuple(limits)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self._prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        limit = next(
+            size for prefix, size in self._limits if scope["path"].startswith(prefix)
+        )
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if not value.isdigit() or int(value) > limit:
+                    response = PlainTextResponse("Payload too large", status_code=413)
+                    await response(scope, receive, send)
+                    return
+                break
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,34 @@
+"""
+CORS Middleware for SurfSense.
+
+Starlette's CORSMiddleware keeps ``allow_origins`` as a list, so every
+request with an Origin header (and every preflight) scans it linearly. This
+subclass freezes the exact origins into a set at startup so the check is a
+single hash lookup regardless of how many trusted origins are configured.
+"""
+
+from collections.abc import Sequence
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
+
+
+class OriginSetCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware with O(1) exact-origin matching."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Sequence[str] = (),
+        **kwargs,
+    ) -> None:
+        super().__init__(app, allow_origins=allow_origins, **kwargs)
+        self._origin_set = frozenset(self.allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins or origin in self._origin_set:
+            return True
+        return (
+            self.allow_origin_regex is not None
+            and self.allow_origin_regex.fullmatch(origin) is not None
+        )
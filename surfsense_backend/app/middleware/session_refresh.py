@@ -1,10 +1,14 @@
+import base64
+import hashlib
 import logging
 import os
+import re
 import time
+
+import orjson
+from cachetools import LRUCache
 from fastapi import Request
-from jose import jwt, JWTError
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.datastructures import MutableHeaders
 
 from app.users import cookie_transport
 
@@ -26,6 +30,102 @@ logger = logging.getLogger(__name__)
 # providing ample time for continued activity while avoiding excessive refreshes.
 REFRESH_THRESHOLD = float(os.getenv("SESSION_REFRESH_THRESHOLD", "0.5"))
 
+# Auth tokens live 24 hours; refresh once less than this many seconds remain
+TOKEN_LIFETIME_SECONDS = 86400
+_REFRESH_CUTOFF_SECONDS = int(TOKEN_LIFETIME_SECONDS * REFRESH_THRESHOLD)
+
+# Task 7: Environment-aware logging; refresh events are INFO in production
+_REFRESH_LOG_LEVEL = (
+    logging.INFO
+    if os.getenv("ENVIRONMENT", "development") == "production"
+    else logging.DEBUG
+)
+
+# Refresh deadlines (exp minus the refresh window) keyed by a BLAKE2b digest
+# of the token, so this larger cache never holds raw tokens. A token's
+# deadline never changes, so repeat requests with the same cookie decide with
+# one lookup and one comparison instead of a JWT decode. Least recently used entries, which
+# include tokens that have long expired, are evicted first. dispatch runs on
+# the event loop thread, so the cache needs no lock.
+_refresh_deadlines: LRUCache = LRUCache(maxsize=10000)
+
+# Small front cache keyed by the cookie string itself for the hottest
+# sessions (e.g. polling tabs): a str lookup needs no digest at all. It holds
+# deadlines rather than decisions, so answers still flip at the right time.
+# A probabilistic "recently fresh" filter would not be faster than this dict
+# lookup, and a false positive could withhold a refresh a session needs.
+_recent_deadlines: LRUCache = LRUCache(maxsize=2048)
+
+
+# Deadline cached for tokens whose exp cannot be read: never refresh them
+_NEVER = float("inf")
+
+# Bounds on a plausible auth JWT; anything outside them is rejected unread
+_MIN_TOKEN_LENGTH = 100
+_MAX_TOKEN_LENGTH = 4096
+
+# header.payload.signature in the base64url alphabet. The cookie value is
+# echoed into Set-Cookie, and Starlette unquotes octal escapes such as
+# \015\012, so anything outside this charset could inject header lines.
+_TOKEN_SHAPE_RE = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*")
+
+
+def _refresh_due(deadline: float, now: float) -> bool:
+    """Whether a token with this refresh deadline should be refreshed now.
+
+    The token expires _REFRESH_CUTOFF_SECONDS after its deadline; past that
+    point it is dead and must not be re-issued.
+    """
+    return deadline <= now < deadline + _REFRESH_CUTOFF_SECONDS
+
+
+_EXP_KEY = b'"exp":'
+
+
+def _scan_exp(payload: bytes) -> int | None:
+    """Find an integer exp claim in raw payload bytes without parsing JSON."""
+    i = payload.find(_EXP_KEY)
+    # Only accept the key at object level, not inside another string value
+    if i < 0 or payload[i - 1 : i] not in (b"{", b",", b" "):
+        return None
+    i += len(_EXP_KEY)
+    while payload[i : i + 1] in (b" ", b"\t"):
+        i += 1
+    j = i
+    while payload[j : j + 1].isdigit():
+        j += 1
+    # Leave fractional or exponent forms to the JSON parser
+    if j == i or payload[j : j + 1] in (b".", b"e", b"E"):
+        return None
+    return int(payload[i:j])
+
+
+def _extract_exp(token: str) -> int | None:
+    """
+    Read the exp claim straight from a JWT payload segment.
+
+    The signature is not checked: fastapi-users has already validated the
+    token, so only the claim itself is needed.
+
+    Args:
+        token: JWT token string
+
+    Returns:
+        The exp timestamp, or None if the token is malformed or has no exp
+    """
+    try:
+        payload = token.split(".", 2)[1]
+        padding = "=" * (-len(payload) % 4)
+        raw = base64.urlsafe_b64decode(payload + padding)
+        exp = _scan_exp(raw)
+        if exp is not None:
+            return exp
+        # Fall back to a full parse for unusual layouts (e.g. float exp)
+        exp = orjson.loads(raw).get("exp")
+    except Exception:
+        return None
+    return exp if isinstance(exp, int | float) else None
+
 
 class SlidingSessionMiddleware(BaseHTTPMiddleware):
     """
@@ -78,20 +178,47 @@ class SlidingSessionMiddleware(BaseHTTPMiddleware):
     - Current implementation prioritizes UX with acceptable security for most use cases
     """
 
-    def __init__(self, app, secret_key: str):
+    # Paths that never need a session refresh: probes, API docs and static
+    # assets. Skipping them also keeps Set-Cookie off cacheable responses.
+    _SKIP_PREFIXES = (
+        "/health",
+        "/static",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+        "/favicon",
+    )
+
+    def __init__(self, app):
         """
         Initialize sliding session middleware.
 
-        Task 2: Accept and store JWT secret key for token decoding.
+        No JWT secret is needed: only the exp claim is read, and the token's
+        signature has already been verified by fastapi-users.
 
         Args:
             app: ASGI application
-            secret_key: JWT secret key used for token signing/verification
         """
         super().__init__(app)
-        self.secret_key = secret_key
 
-    def _should_refresh_cookie(self, token: str) -> bool:
+        # Set-Cookie attributes for the refreshed auth cookie, snapshotted
+        # from the auth transport so the cookie matches the one set at login
+        # and pre-encoded for the raw ASGI headers. Only the value varies per
+        # request; JWTs are cookie-safe, so it needs no quoting.
+        self._cookie_suffix = "".join(
+            [
+                f"; Domain={cookie_transport.cookie_domain}"
+                if cookie_transport.cookie_domain
+                else "",
+                "; HttpOnly",
+                f"; Max-Age={TOKEN_LIFETIME_SECONDS}",
+                f"; Path={cookie_transport.cookie_path}",
+                f"; SameSite={cookie_transport.cookie_samesite}",
+                "; Secure" if cookie_transport.cookie_secure else "",
+            ]
+        ).encode("latin-1")
+
+    def _should_refresh_cookie(self, token: str, now: float | None = None) -> bool:
         """
         Determine if the cookie should be refreshed based on token age.
 
@@ -99,99 +226,127 @@ class SlidingSessionMiddleware(BaseHTTPMiddleware):
         (50%) of total lifetime. This prevents unnecessary cookie updates on
         every request.
 
-        Task 1: Uses JWT decode to extract exp and iat claims for intelligent
-        refresh decisions based on actual token lifetime.
+        Task 1: Reads the exp claim for intelligent refresh decisions based on
+        actual token lifetime. Expired tokens and tokens whose exp cannot be
+        read are not refreshed.
 
         Args:
             token: JWT token string
+            now: Current Unix time, read once by the caller; defaults to
+                time.time()
 
         Returns:
             True if cookie should be refreshed, False otherwise
         """
-        # Task 7: Environment-aware logging
-        env = os.getenv("ENVIRONMENT", "development")
-        log_level = logging.INFO if env == "production" else logging.DEBUG
-
-        try:
-            # Task 1: Decode JWT without signature verification
-            # The token has already been validated by fastapi-users
-            payload = jwt.decode(
-                token, self.secret_key, options={"verify_signature": False}
-            )
+        # Cheap shape check first: anything that is not header.payload.signature
+        # of plausible size is never refreshed, and never hashed or decoded
+        if not _MIN_TOKEN_LENGTH <= len(token) <= _MAX_TOKEN_LENGTH:
+            return False
+        if not _TOKEN_SHAPE_RE.fullmatch(token):
+            return False
 
-            # Get expiration timestamp from token
-            exp = payload.get("exp")
-            if not exp:
-                # No expiration claim, refresh to be safe
-                return True
+        if now is None:
+            now = time.time()
+
+        deadline = _recent_deadlines.get(token)
+        if deadline is not None:
+            return _refresh_due(deadline, now)
+
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        deadline = _refresh_deadlines.get(cache_key)
+        if deadline is not None:
+            _recent_deadlines[token] = deadline
+            return _refresh_due(deadline, now)
+
+        # Task 1: Read exp without verifying the signature
+        # The token has already been validated by fastapi-users
+        exp = _extract_exp(token)
+        if exp is None:
+            # Task 3: Malformed token or no exp claim - don't refresh. Cache a
+            # deadline that never arrives so a client replaying the same bad
+            # cookie is neither decoded nor logged again.
+            _refresh_deadlines[cache_key] = _NEVER
+            _recent_deadlines[token] = _NEVER
+            logger.warning("Unreadable JWT expiry, skipping refresh")
+            return False
 
-            current_time = time.time()
+        if exp <= now:
+            # Task 3: Expired token - never re-issue it with a fresh Max-Age
+            _refresh_deadlines[cache_key] = _NEVER
+            _recent_deadlines[token] = _NEVER
+            logger.debug("Expired JWT token, skipping refresh")
+            return False
 
-            # Calculate remaining lifetime and total lifetime
-            remaining_time = exp - current_time
+        _refresh_deadlines[cache_key] = exp - _REFRESH_CUTOFF_SECONDS
+        _recent_deadlines[token] = exp - _REFRESH_CUTOFF_SECONDS
 
-            # Estimate issued time (exp - 24 hours for 24h tokens)
-            # This is approximate but sufficient for threshold check
-            total_lifetime = 86400  # 24 hours in seconds
+        # Calculate remaining lifetime; the total lifetime is assumed to
+        # be TOKEN_LIFETIME_SECONDS, which is sufficient for the check
+        remaining_time = exp - now
 
-            # Refresh if remaining time is less than threshold percentage
-            if remaining_time < (total_lifetime * REFRESH_THRESHOLD):
+        # Refresh if remaining time is less than threshold percentage
+        # Messages are only formatted when their level is enabled
+        if remaining_time < _REFRESH_CUTOFF_SECONDS:
+            if logger.isEnabledFor(_REFRESH_LOG_LEVEL):
                 logger.log(
-                    log_level,
+                    _REFRESH_LOG_LEVEL,
                     f"Cookie refresh needed: {remaining_time:.0f}s remaining "
-                    f"({remaining_time/3600:.1f}h) < threshold {total_lifetime * REFRESH_THRESHOLD:.0f}s"
+                    f"({remaining_time/3600:.1f}h) < threshold {_REFRESH_CUTOFF_SECONDS}s"
                 )
-                return True
-            else:
-                logger.log(
-                    logging.DEBUG,  # Always debug for skip messages
-                    f"Cookie refresh skipped: {remaining_time:.0f}s remaining "
-                    f"({remaining_time/3600:.1f}h) >= threshold {total_lifetime * REFRESH_THRESHOLD:.0f}s"
-                )
-                return False
-
-        except JWTError as e:
-            # Task 3: JWT decode error handling - don't refresh invalid token
-            logger.warning(f"Invalid or expired JWT token, skipping refresh: {e}")
-            return False
-        except Exception as e:
-            # Unexpected error - refresh to be safe
-            logger.error(f"Unexpected error checking token refresh: {e}", exc_info=True)
             return True
 
+        # Always debug for skip messages
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Cookie refresh skipped: {remaining_time:.0f}s remaining "
+                f"({remaining_time/3600:.1f}h) >= threshold {_REFRESH_CUTOFF_SECONDS}s"
+            )
+        return False
+
     async def dispatch(self, request: Request, call_next):
-        # Task 12: Performance measurement
-        start_time = time.time()
+        if request.url.path.startswith(self._SKIP_PREFIXES):
+            return await call_next(request)
 
+        # The refresh check runs after the route, and it only reads exp from an
+        # unverified payload. So it cannot stand in for the auth dependency's
+        # own signature-checked decode.
         response = await call_next(request)
 
         # Check if user is authenticated by looking for the auth cookie
         auth_cookie = request.cookies.get("surfsense_auth")
 
         if auth_cookie and response.status_code < 400:
+            # Task 12: Performance measurement, covering only this
+            # middleware's own work for authenticated requests
+            start_time = time.monotonic()
+
             # User is authenticated and request was successful
             # Check if cookie needs refreshing based on threshold
-            if self._should_refresh_cookie(auth_cookie):
+            # Responses that already set the auth cookie (login, logout,
+            # 2FA) keep their own cookie instead of getting a second one
+            if self._should_refresh_cookie(auth_cookie, time.time()) and not any(
+                name == b"set-cookie" and value.startswith(b"surfsense_auth=")
+                for name, value in response.raw_headers
+            ):
                 # Refresh the cookie with a new 24h expiration
-                response.set_cookie(
-                    key="surfsense_auth",
-                    value=auth_cookie,
-                    max_age=86400,  # 24 hours
-                    httponly=True,
-                    secure=cookie_transport.cookie_secure,
-                    samesite=cookie_transport.cookie_samesite,
-                    path=cookie_transport.cookie_path,
-                    domain=cookie_transport.cookie_domain,
+                response.raw_headers.append(
+                    (
+                        b"set-cookie",
+                        b"surfsense_auth="
+                        + auth_cookie.encode("latin-1")
+                        + self._cookie_suffix,
+                    )
                 )
 
                 logger.info("Refreshed authentication cookie for sliding session")
 
-        # Task 12: Log performance warning if middleware is slow
-        duration = time.time() - start_time
-        if duration > 0.05:  # 50ms threshold
-            logger.warning(
-                f"SlidingSessionMiddleware took {duration:.3f}s "
-                f"(threshold: 0.050s). This may indicate performance issues."
-            )
+            # Task 12: Log performance warning if middleware is slow
+            duration = time.monotonic() - start_time
+            # 50ms threshold
+            if duration > 0.05 and logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    f"SlidingSessionMiddleware took {duration:.3f}s "
+                    f"(threshold: 0.050s). This may indicate performance issues."
+                )
 
         return response
@@ -1,13 +1,18 @@
+import asyncio
 import hashlib
 import logging
 import os
 import re
 import time
+from contextlib import aclosing
+from functools import lru_cache
 
+import orjson
+import redis.asyncio as aioredis
 from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field, field_validator
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import Any, AsyncGenerator, Dict, Literal, Optional
@@ -63,19 +68,138 @@ def get_env_int(env_var: str, default: int, unit: str = "") -> int:
 # Input validation limits
 MAX_INPUT_LENGTH = 10000
 MAX_CONTEXT_LENGTH = 10000
+# Largest JSON body that can carry both fields at their limits: up to six bytes
+# per character when non-ASCII text is sent as \uXXXX escapes, plus envelope
+MAX_REQUEST_BODY_BYTES = 6 * (MAX_INPUT_LENGTH + MAX_CONTEXT_LENGTH) + 1024
+
+# Streaming batches: flush buffered LLM output at this size or age
+STREAM_FLUSH_BYTES = 512
+STREAM_FLUSH_SECONDS = 0.05
 
 # Cache configuration
 # Environment-configurable for production flexibility
 CACHE_MAX_SIZE = get_env_int("AI_ASSIST_CACHE_MAX_SIZE", 1000)
 CACHE_TTL_SECONDS = get_env_int("AI_ASSIST_CACHE_TTL", 3600, "seconds")
+# Larger responses are not cached so one-off large outputs don't evict the rest
+CACHE_MAX_RESPONSE_BYTES = get_env_int(
+    "AI_ASSIST_CACHE_MAX_RESPONSE_BYTES", 262144, "bytes"
+)
 
 # Task 7: TTL-based response cache
 # Caches responses to reduce LLM costs and improve latency for repeated requests
 # Max size prevents unbounded memory growth, TTL ensures fresh responses
+# Keys are (command, user_input, context) tuples from generate_cache_key;
+# values are the UTF-8 encoded response bodies
 _response_cache: TTLCache = TTLCache(maxsize=CACHE_MAX_SIZE, ttl=CACHE_TTL_SECONDS)
 
+# Optional Redis tier behind the per-worker cache, shared by all workers so
+# the hit rate does not shrink with the worker count. Off by default.
+# AI_ASSIST_REDIS_URL should point at a database of its own (e.g.
+# redis://redis:6379/2) so cached LLM output stays out of the Celery broker;
+# it falls back to CELERY_BROKER_URL only when unset.
+REDIS_CACHE_ENABLED = os.getenv("AI_ASSIST_REDIS_CACHE", "false").lower() == "true"
+REDIS_URL = os.getenv("AI_ASSIST_REDIS_URL") or os.getenv(
+    "CELERY_BROKER_URL", "redis://localhost:6379/0"
+)
+REDIS_CACHE_PREFIX = "ai_assist:response:"
+_redis_client: aioredis.Redis | None = None
+
+
+def get_redis_client() -> aioredis.Redis:
+    """Get or create the async Redis client for the shared response cache."""
+    global _redis_client
+    if _redis_client is None:
+        # Short timeouts: a slow Redis must not cost more than an LLM call
+        _redis_client = aioredis.from_url(
+            REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _redis_client
+
+
+def redis_cache_key(cache_key: tuple[str, str, str]) -> str:
+    """Redis key for a response, from a 128-bit digest of the cache key.
+
+    The key is JSON-encoded before hashing so field boundaries stay
+    unambiguous whatever characters the user text contains.
+    """
+    digest = hashlib.blake2b(orjson.dumps(cache_key), digest_size=16)
+    return f"{REDIS_CACHE_PREFIX}{digest.hexdigest()}"
+
+
+# Requests currently streaming an LLM response, by cache key. Identical
+# requests arriving meanwhile await the future for the finished response.
+_inflight: Dict[tuple[str, str, str], asyncio.Future] = {}
+
+# LLM instance per user id, so warm users skip the preference and LLM config
+# queries. Kept short-lived, and invalidated when preferences or configs change.
+# The cache and its invalidation are per process: with several workers, only
+# the worker that handled the change drops its entry, and the others keep
+# serving the old LLM for up to AI_ASSIST_USER_LLM_CACHE_TTL seconds. Lower the
+# TTL if config changes must apply sooner.
+USER_LLM_CACHE_TTL_SECONDS = get_env_int("AI_ASSIST_USER_LLM_CACHE_TTL", 300, "seconds")
+_user_llm_cache: TTLCache = TTLCache(maxsize=CACHE_MAX_SIZE, ttl=USER_LLM_CACHE_TTL_SECONDS)
+
+
+def invalidate_user_llm_cache(user_id: Any = None) -> None:
+    """
+    Drop cached assist LLMs after a preference or LLM config change.
+
+    Only affects the calling worker process; other workers pick the change up
+    once their entries expire after USER_LLM_CACHE_TTL_SECONDS.
+
+    Args:
+        user_id: User whose entry to drop; None drops every entry, for changes
+                 to a shared LLM config that may back many users' preferences
+    """
+    if user_id is None:
+        _user_llm_cache.clear()
+    else:
+        _user_llm_cache.pop(user_id, None)
+
 
 # Task 8: Prompt injection detection
+# Each pattern with a literal it cannot match without. The substring test is
+# a plain C scan that rules most patterns out before any regex runs, and the
+# separately compiled case-sensitive patterns keep re's literal-prefix search,
+# which a fused or IGNORECASE alternation loses (over 10x slower on 10 KB).
+# None of the patterns nests quantifiers, so backtracking stays linear in the
+# (length-capped) input and no DFA engine is needed.
+_INJECTION_PATTERNS = [
+    ("ignore", r"ignore\s+(previous|all|above)"),
+    ("disregard", r"disregard\s+(previous|all|above)"),
+    ("forget", r"forget\s+(previous|all|above)"),
+    ("instruction", r"new\s+instructions?:"),
+    ("system", r"system\s*:"),
+    ("assistant", r"assistant\s*:"),
+    ("system", r"<\s*system\s*>"),
+    ("act", r"act\s+as\s+if"),
+    ("pretend", r"pretend\s+(you|to)\s+are"),
+]
+_INJECTION_CHECKS = tuple(
+    (literal, re.compile(pattern), pattern) for literal, pattern in _INJECTION_PATTERNS
+)
+
+
+# Shortest text any pattern can match ("system:")
+_MIN_INJECTION_LENGTH = 7
+
+
+@lru_cache(maxsize=1024)
+def _find_injection_pattern(text: str) -> str | None:
+    """Return the first injection pattern found in text, memoized per string.
+
+    Repeated prompts skip the scan; 1024 entries of at most 10,000 characters
+    bound the cache to about 10 MB.
+    """
+    # One lowered copy shared by every literal test and regex; it costs a few
+    # microseconds, far less than matching case-insensitively
+    text_lower = text.lower()
+    for literal, regex, pattern in _INJECTION_CHECKS:
+        if literal in text_lower and regex.search(text_lower):
+            return pattern
+    return None
+
+
 def contains_prompt_injection(text: str) -> bool:
     """
     Detect potential prompt injection attempts in user input.
@@ -88,41 +212,33 @@ def contains_prompt_injection(text: str) -> bool:
     Returns:
         True if suspicious patterns detected, False otherwise
     """
-    if not text:
+    if not text or len(text) < _MIN_INJECTION_LENGTH:
         return False
 
-    text_lower = text.lower()
-    suspicious_patterns = [
-        r"ignore\s+(previous|all|above)",
-        r"disregard\s+(previous|all|above)",
-        r"forget\s+(previous|all|above)",
-        r"new\s+instructions?:",
-        r"system\s*:",
-        r"assistant\s*:",
-        r"<\s*system\s*>",
-        r"act\s+as\s+if",
-        r"pretend\s+(you|to)\s+are",
-    ]
-
-    for pattern in suspicious_patterns:
-        if re.search(pattern, text_lower):
-            logger.warning(
-                "prompt_injection_detected",
-                pattern=pattern,
-                text_preview=text[:100]
-            )
-            return True
+    pattern = _find_injection_pattern(text)
+    if pattern is None:
+        return False
 
-    return False
+    logger.warning(
+        "prompt_injection_detected",
+        pattern=pattern,
+        text_preview=text[:100]
+    )
+    return True
 
 
-# Helper function for cache key generation
-def generate_cache_key(command: str, user_input: Optional[str], context: Optional[str]) -> str:
+# Helper functions for cache key generation
+def generate_cache_key(
+    command: str, user_input: Optional[str], context: Optional[str]
+) -> tuple[str, str, str]:
     """
     Generate deterministic cache key for request caching.
 
-    Uses SHA256 hash of command, user_input, and context to create a unique
-    key for caching LLM responses. Same inputs always produce the same key.
+    The key is a plain tuple: the cache dict hashes it directly, so no
+    encoded copy or digest of up to 20,000 characters is built per request.
+    Same inputs always produce the same key, and inputs that differ only in
+    leading or trailing whitespace share one, since the LLM answers them
+    alike.
 
     Args:
         command: The command type (draft, improve, shorten, etc.)
@@ -130,13 +246,61 @@ def generate_cache_key(command: str, user_input: Optional[str], context: Optiona
         context: Additional context (optional)
 
     Returns:
-        64-character hexadecimal cache key (SHA256 hash)
+        Tuple of command, user_input and context
     """
-    cache_string = f"{command}:{user_input or ''}:{context or ''}"
-    return hashlib.sha256(cache_string.encode()).hexdigest()
+    return (command, (user_input or "").strip(), (context or "").strip())
+
+
+def cache_key_id(cache_key: tuple[str, str, str]) -> str:
+    """
+    Short stable identifier for a cache key, for log events only.
+
+    Keeps raw user text out of the logs; only computed when an event is logged.
+
+    Returns:
+        16-character hexadecimal identifier (BLAKE2b hash)
+    """
+    return hashlib.blake2b(orjson.dumps(cache_key), digest_size=8).hexdigest()
 
 
 # Task 10: Extract prompt building logic
+# Prompt template, the field it is filled from, and the error raised when that
+# field is empty, per command. Prompts never change at runtime, so building
+# one is a dict lookup and a single format call.
+PROMPT_TEMPLATES: Dict[str, tuple[str, str, str]] = {
+    "draft": (
+        "Based on the following context, write a helpful response:\n\nContext: {text}\n\nResponse:",
+        "context",
+        "Context required for draft command",
+    ),
+    "improve": (
+        "Improve the following text while keeping its meaning. Make it clearer and more engaging:\n\n{text}\n\nImproved version:",
+        "user_input",
+        "User input required for improve command",
+    ),
+    "shorten": (
+        "Make the following text more concise while preserving the key information:\n\n{text}\n\nShortened version:",
+        "user_input",
+        "User input required for shorten command",
+    ),
+    "translate": (
+        "Translate the following text to English:\n\n{text}\n\nTranslation:",
+        "user_input",
+        "User input required for translate command",
+    ),
+    "formal": (
+        "Rewrite the following text in a more professional and formal tone:\n\n{text}\n\nFormal version:",
+        "user_input",
+        "User input required for formal command",
+    ),
+    "casual": (
+        "Rewrite the following text in a more casual and friendly tone:\n\n{text}\n\nCasual version:",
+        "user_input",
+        "User input required for casual command",
+    ),
+}
+
+
 def build_prompt(command: str, user_input: Optional[str], context: Optional[str]) -> str:
     """
     Build LLM prompt based on command type and inputs.
@@ -152,38 +316,83 @@ def build_prompt(command: str, user_input: Optional[str], context: Optional[str]
     Raises:
         ValueError: If required inputs are missing for the command
     """
-    if command == "draft":
-        if not context:
-            raise ValueError("Context required for draft command")
-        return f"Based on the following context, write a helpful response:\n\nContext: {context}\n\nResponse:"
-
-    elif command == "improve":
-        if not user_input:
-            raise ValueError("User input required for improve command")
-        return f"Improve the following text while keeping its meaning. Make it clearer and more engaging:\n\n{user_input}\n\nImproved version:"
-
-    elif command == "shorten":
-        if not user_input:
-            raise ValueError("User input required for shorten command")
-        return f"Make the following text more concise while preserving the key information:\n\n{user_input}\n\nShortened version:"
-
-    elif command == "translate":
-        if not user_input:
-            raise ValueError("User input required for translate command")
-        return f"Translate the following text to English:\n\n{user_input}\n\nTranslation:"
-
-    elif command == "formal":
-        if not user_input:
-            raise ValueError("User input required for formal command")
-        return f"Rewrite the following text in a more professional and formal tone:\n\n{user_input}\n\nFormal version:"
-
-    elif command == "casual":
-        if not user_input:
-            raise ValueError("User input required for casual command")
-        return f"Rewrite the following text in a more casual and friendly tone:\n\n{user_input}\n\nCasual version:"
+    try:
+        template, field, error = PROMPT_TEMPLATES[command]
+    except KeyError:
+        raise ValueError(f"Unknown command: {command}") from None
 
-    else:
-        raise ValueError(f"Unknown command: {command}")
+    value = user_input if field == "user_input" else context
+    if not value:
+        raise ValueError(error)
+    return template.format(text=value)
+
+
+async def get_assist_llm(session: AsyncSession, user: User) -> Any:
+    """
+    Resolve the LLM used for assist requests, cached per user.
+
+    Looking it up costs two queries (first search space preference, then the
+    LLM config), so the instance is kept for USER_LLM_CACHE_TTL_SECONDS.
+
+    Args:
+        session: Database session
+        user: Authenticated user
+
+    Returns:
+        LLM instance for the user's first search space
+
+    Raises:
+        HTTPException: 400 if no search space is configured, 500 if no LLM is available
+    """
+    llm = _user_llm_cache.get(user.id)
+    if llm is not None:
+        return llm
+
+    # Get user's first search space to access LLM configuration
+    result = await session.execute(
+        select(UserSearchSpacePreference)
+        .where(UserSearchSpacePreference.user_id == user.id)
+        .limit(1)
+    )
+    preference = result.scalars().first()
+
+    if not preference:
+        # Task 4: Sanitized error message
+        raise HTTPException(
+            status_code=400,
+            detail="No search space configured. Please configure your search space first."
+        )
+
+    # Task 11: LLM Selection - Using standard LLM for quality
+    # Standard LLM provides better quality for text improvement tasks compared to fast LLM.
+    # Fast LLM prioritizes speed over quality and may produce lower-quality outputs for
+    # creative tasks like improving text, drafting responses, or formal/casual rewrites.
+    #
+    # For simple tasks like shortening or translation, fast LLM might be sufficient,
+    # but we prioritize consistent quality across all commands.
+    #
+    # Alternative: Implement per-command LLM selection:
+    # command_llm_map = {
+    #     "draft": get_user_llm_instance,      # Quality matters
+    #     "improve": get_user_llm_instance,    # Quality matters
+    #     "shorten": get_user_fast_llm,        # Speed acceptable
+    #     "translate": get_user_fast_llm,      # Speed acceptable
+    #     "formal": get_user_llm_instance,     # Quality matters
+    #     "casual": get_user_llm_instance,     # Quality matters
+    # }
+    llm = await get_user_llm_instance(
+        session, str(user.id), preference.search_space_id, role=LLMRole.LONG_CONTEXT
+    )
+
+    if not llm:
+        # Task 4: Sanitized error message
+        raise HTTPException(
+            status_code=500,
+            detail="AI service temporarily unavailable. Please try again later."
+        )
+
+    _user_llm_cache[user.id] = llm
+    return llm
 
 
 class AssistRequest(BaseModel):
@@ -244,13 +453,247 @@ class AssistRequest(BaseModel):
         description="Type of AI assistance to perform"
     )
 
-    # Task 8: Validate against prompt injection
-    @field_validator("user_input", "context")
-    @classmethod
-    def validate_no_injection(cls, v: str | None) -> str | None:
-        if v and contains_prompt_injection(v):
-            raise ValueError("Input contains suspicious patterns")
-        return v
+
+async def get_cached_response(
+    cache_key: tuple[str, str, str], user_id: str
+) -> bytes | None:
+    """
+    Look a response up in the worker cache, then in Redis when enabled.
+
+    A single get() per tier avoids the entry expiring between a membership
+    check and the read. A Redis hit is copied into the worker cache so the
+    next lookup stays local. Cache errors are logged and count as a miss.
+
+    Returns:
+        The cached response body, or None on a miss
+    """
+    try:
+        cached_response = _response_cache.get(cache_key)
+        tier = "memory"
+        if cached_response is None and REDIS_CACHE_ENABLED:
+            cached_response = await get_redis_client().get(redis_cache_key(cache_key))
+            tier = "redis"
+            if cached_response is not None:
+                _response_cache[cache_key] = cached_response
+    except Exception as cache_error:
+        logger.warning(
+            "ai_assist_cache_read_error",
+            cache_key=cache_key_id(cache_key),
+            error=str(cache_error),
+            user_id=user_id
+        )
+        return None
+
+    if cached_response is not None:
+        logger.info(
+            "ai_assist_cache_hit",
+            cache_key=cache_key_id(cache_key),
+            tier=tier,
+            user_id=user_id
+        )
+    return cached_response
+
+
+async def store_response(
+    cache_key: tuple[str, str, str], response: bytes, user_id: str
+) -> None:
+    """Cache a complete response in both tiers unless it is too large."""
+    if len(response) > CACHE_MAX_RESPONSE_BYTES:
+        return
+    try:
+        _response_cache[cache_key] = response
+        if REDIS_CACHE_ENABLED:
+            await get_redis_client().set(
+                redis_cache_key(cache_key), response, ex=CACHE_TTL_SECONDS
+            )
+    except Exception as cache_error:
+        # Cache write error - log but don't fail the request
+        logger.warning(
+            "ai_assist_cache_write_error",
+            cache_key=cache_key_id(cache_key),
+            error=str(cache_error),
+            user_id=user_id
+        )
+
+
+async def await_inflight_response(
+    cache_key: tuple[str, str, str], user_id: str
+) -> bytes | None:
+    """
+    Wait for an identical request already streaming in this worker.
+
+    Returns:
+        That request's response body, or None if there is none, it failed, or
+        its response was too large to cache; the caller then calls the LLM
+        itself
+    """
+    pending = _inflight.get(cache_key)
+    if pending is None:
+        return None
+    # Shielded so a waiter that disconnects does not cancel the shared future
+    shared_response = await asyncio.shield(pending)
+    if shared_response is not None:
+        logger.info(
+            "ai_assist_coalesced",
+            cache_key=cache_key_id(cache_key),
+            user_id=user_id
+        )
+    return shared_response
+
+
+async def coalesce_stream(
+    cache_key: tuple[str, str, str], stream: AsyncGenerator[bytes | str, None]
+) -> AsyncGenerator[bytes | str, None]:
+    """
+    Relay a response stream and release requests waiting on the same key.
+
+    Registered once streaming starts, so the finally clause always runs and
+    waiters are released even on failure or disconnect. They receive the
+    cached body, which is None unless the stream completed and was cached.
+    """
+    result = asyncio.get_running_loop().create_future()
+    owner = _inflight.setdefault(cache_key, result) is result
+    try:
+        async with aclosing(stream):
+            async for data in stream:
+                yield data
+    finally:
+        if owner:
+            del _inflight[cache_key]
+            result.set_result(_response_cache.get(cache_key))
+
+
+class _StreamBatcher:
+    """
+    Batches token-sized LLM chunks into fewer ASGI body messages.
+
+    Chunks are encoded once and joined once at the end, instead of growing a
+    str with += on every chunk. parts[flushed:] are pending until they reach
+    STREAM_FLUSH_BYTES or have waited STREAM_FLUSH_SECONDS.
+    """
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.flushed = 0
+        self.pending_bytes = 0
+        self.last_flush = time.monotonic()
+
+    def add(self, data: bytes) -> bytes | None:
+        """Buffer a chunk and return a batch if one is due."""
+        self.parts.append(data)
+        self.pending_bytes += len(data)
+        now = time.monotonic()
+        if (
+            self.pending_bytes < STREAM_FLUSH_BYTES
+            and now - self.last_flush < STREAM_FLUSH_SECONDS
+        ):
+            return None
+        self.last_flush = now
+        return self.drain()
+
+    def drain(self) -> bytes | None:
+        """Return everything not yet sent, or None if nothing is pending."""
+        if self.flushed == len(self.parts):
+            return None
+        batch = b"".join(self.parts[self.flushed:])
+        self.flushed = len(self.parts)
+        self.pending_bytes = 0
+        return batch
+
+    def body(self) -> bytes:
+        """The whole response so far."""
+        return b"".join(self.parts)
+
+
+def _chunk_bytes(chunk: Any) -> bytes:
+    content = chunk.content if hasattr(chunk, "content") else str(chunk)
+    return content.encode()
+
+
+async def stream_llm_response(
+    llm: Any,
+    prompt: str,
+    cache_key: tuple[str, str, str],
+    request: AssistRequest,
+    user_id: str,
+    start_time: float,
+) -> AsyncGenerator[bytes | str, None]:
+    """
+    Stream an LLM response in batches and cache it once complete.
+
+    A failure ends the stream with a short error note after any output
+    already produced, since the response status has been sent by then.
+    """
+    batcher = _StreamBatcher()
+    error_message = None
+    try:
+        # Task 7: Improved streaming error handling
+        async for chunk in llm.astream(prompt):
+            batch = batcher.add(_chunk_bytes(chunk))
+            if batch is not None:
+                yield batch
+
+        batch = batcher.drain()
+        if batch is not None:
+            yield batch
+
+        accumulated_response = batcher.body()
+        # Task 7: Cache the complete response
+        await store_response(cache_key, accumulated_response, user_id)
+
+        # Task 8: Enhanced telemetry - Log successful completion with all metrics
+        duration_seconds = time.time() - start_time
+        logger.info(
+            "ai_assist_success",
+            user_id=user_id,
+            command=request.command,
+            input_length=len(request.user_input or ""),
+            context_length=len(request.context or ""),
+            response_length=len(accumulated_response),
+            duration_seconds=round(duration_seconds, 2),  # Numeric for metrics aggregation
+            cached=False,
+        )
+
+    except TimeoutError as e:
+        # LLM service timeout (SECURITY: sanitize error messages)
+        logger.error(
+            "ai_assist_timeout",
+            user_id=user_id,
+            command=request.command,
+            error=sanitize_exception_message(e),
+            exc_info=True
+        )
+        error_message = "\n\n[Error: Request timed out. The AI service is taking too long to respond. Please try again.]"
+    except ConnectionError as e:
+        # Network/connection issues (SECURITY: sanitize error messages)
+        logger.error(
+            "ai_assist_connection_error",
+            user_id=user_id,
+            command=request.command,
+            error=sanitize_exception_message(e),
+            exc_info=True
+        )
+        error_message = "\n\n[Error: Connection to AI service failed. Please check your network and try again.]"
+    except Exception as e:
+        # Task 4, 7: Sanitized error handling for other exceptions
+        error_msg = sanitize_exception_message(e)
+        logger.error(
+            "ai_assist_streaming_error",
+            user_id=user_id,
+            command=request.command,
+            error=error_msg,
+            error_type=type(e).__name__,
+            exc_info=True
+        )
+        error_message = "\n\n[Error: Unable to complete the request. Please try again.]"
+
+    # Output batched before a failure still reaches the client, ahead of the
+    # error note
+    if error_message is not None:
+        batch = batcher.drain()
+        if batch is not None:
+            yield batch
+        yield error_message
 
 
 @router.post("/")
@@ -292,6 +735,8 @@ async def assist(
     Raises:
         HTTPException: 400 for invalid input, 429 for rate limit, 500 for server errors
     """
+    # Formatted once; every log event below reuses it
+    user_id = str(user.id)
 
     try:
         # Task 12: Redundant length validation (defense in depth against Pydantic bypasses)
@@ -310,7 +755,7 @@ async def assist(
         start_time = time.time()
         logger.info(
             "ai_assist_request",
-            user_id=str(user.id),
+            user_id=user_id,
             command=request.command,
             input_length=len(request.user_input or ""),
             context_length=len(request.context or ""),
@@ -319,70 +764,25 @@ async def assist(
 
         # Task 7: Check TTL cache first
         cache_key = generate_cache_key(request.command, request.user_input, request.context)
-
-        # Try to retrieve from cache with error handling
-        try:
-            if cache_key in _response_cache:
-                logger.info(
-                    "ai_assist_cache_hit",
-                    cache_key=cache_key,
-                    user_id=str(user.id)
-                )
-                cached_response = _response_cache[cache_key]
-                async def serve_cached() -> AsyncGenerator[str, None]:
-                    yield cached_response
-                return StreamingResponse(serve_cached(), media_type="text/plain")
-        except Exception as cache_error:
-            # Cache read error - log and continue without cache
-            logger.warning(
-                "ai_assist_cache_read_error",
-                cache_key=cache_key,
-                error=str(cache_error),
-                user_id=str(user.id)
-            )
-
-        # Get user's first search space to access LLM configuration
-        result = await session.execute(
-            select(UserSearchSpacePreference)
-            .where(UserSearchSpacePreference.user_id == user.id)
-            .limit(1)
-        )
-        preference = result.scalars().first()
-
-        if not preference:
-            # Task 4: Sanitized error message
+        cached_response = await get_cached_response(cache_key, user_id)
+        if cached_response is None:
+            cached_response = await await_inflight_response(cache_key, user_id)
+        if cached_response is not None:
+            # The text is complete, so send it in one body message instead of
+            # through a streaming generator
+            return Response(content=cached_response, media_type="text/plain")
+
+        # Task 8: Validate against prompt injection. Runs after the cache
+        # lookup: only inputs that passed this check are ever cached, so hits
+        # skip the scan.
+        if contains_prompt_injection(request.user_input) or contains_prompt_injection(
+            request.context
+        ):
             raise HTTPException(
-                status_code=400,
-                detail="No search space configured. Please configure your search space first."
+                status_code=400, detail="Input contains suspicious patterns"
             )
 
-        # Task 11: LLM Selection - Using standard LLM for quality
-        # Standard LLM provides better quality for text improvement tasks compared to fast LLM.
-        # Fast LLM prioritizes speed over quality and may produce lower-quality outputs for
-        # creative tasks like improving text, drafting responses, or formal/casual rewrites.
-        #
-        # For simple tasks like shortening or translation, fast LLM might be sufficient,
-        # but we prioritize consistent quality across all commands.
-        #
-        # Alternative: Implement per-command LLM selection:
-        # command_llm_map = {
-        #     "draft": get_user_llm_instance,      # Quality matters
-        #     "improve": get_user_llm_instance,    # Quality matters
-        #     "shorten": get_user_fast_llm,        # Speed acceptable
-        #     "translate": get_user_fast_llm,      # Speed acceptable
-        #     "formal": get_user_llm_instance,     # Quality matters
-        #     "casual": get_user_llm_instance,     # Quality matters
-        # }
-        llm = await get_user_llm_instance(
-            session, str(user.id), preference.search_space_id, role=LLMRole.LONG_CONTEXT
-        )
-
-        if not llm:
-            # Task 4: Sanitized error message
-            raise HTTPException(
-                status_code=500,
-                detail="AI service temporarily unavailable. Please try again later."
-            )
+        llm = await get_assist_llm(session, user)
 
         # Task 10: Use extracted prompt building logic
         try:
@@ -391,79 +791,10 @@ async def assist(
             # Task 4: Convert ValueError to HTTPException with sanitized message
             raise HTTPException(status_code=400, detail=str(e))
 
-        # Stream the response with improved error handling
-        async def generate() -> AsyncGenerator[str, None]:
-            accumulated_response = ""
-            try:
-                # Task 7: Improved streaming error handling
-                async for chunk in llm.astream(prompt):
-                    if hasattr(chunk, "content"):
-                        content = chunk.content
-                    else:
-                        content = str(chunk)
-
-                    accumulated_response += content
-                    yield content
-
-                # Task 7: Cache the complete response with error handling
-                try:
-                    _response_cache[cache_key] = accumulated_response
-                except Exception as cache_error:
-                    # Cache write error - log but don't fail the request
-                    logger.warning(
-                        "ai_assist_cache_write_error",
-                        cache_key=cache_key,
-                        error=str(cache_error),
-                        user_id=str(user.id)
-                    )
-
-                # Task 8: Enhanced telemetry - Log successful completion with all metrics
-                duration_seconds = time.time() - start_time
-                logger.info(
-                    "ai_assist_success",
-                    user_id=str(user.id),
-                    command=request.command,
-                    input_length=len(request.user_input or ""),
-                    context_length=len(request.context or ""),
-                    response_length=len(accumulated_response),
-                    duration_seconds=round(duration_seconds, 2),  # Numeric for metrics aggregation
-                    cached=False,
-                )
-
-            except TimeoutError as e:
-                # LLM service timeout (SECURITY: sanitize error messages)
-                logger.error(
-                    "ai_assist_timeout",
-                    user_id=str(user.id),
-                    command=request.command,
-                    error=sanitize_exception_message(e),
-                    exc_info=True
-                )
-                yield "\n\n[Error: Request timed out. The AI service is taking too long to respond. Please try again.]"
-            except ConnectionError as e:
-                # Network/connection issues (SECURITY: sanitize error messages)
-                logger.error(
-                    "ai_assist_connection_error",
-                    user_id=str(user.id),
-                    command=request.command,
-                    error=sanitize_exception_message(e),
-                    exc_info=True
-                )
-                yield "\n\n[Error: Connection to AI service failed. Please check your network and try again.]"
-            except Exception as e:
-                # Task 4, 7: Sanitized error handling for other exceptions
-                error_msg = sanitize_exception_message(e)
-                logger.error(
-                    "ai_assist_streaming_error",
-                    user_id=str(user.id),
-                    command=request.command,
-                    error=error_msg,
-                    error_type=type(e).__name__,
-                    exc_info=True
-                )
-                yield "\n\n[Error: Unable to complete the request. Please try again.]"
-
-        return StreamingResponse(generate(), media_type="text/plain")
+        stream = stream_llm_response(llm, prompt, cache_key, request, user_id, start_time)
+        return StreamingResponse(
+            coalesce_stream(cache_key, stream), media_type="text/plain"
+        )
 
     except HTTPException:
         # Re-raise HTTPExceptions as-is
@@ -474,7 +805,7 @@ async def assist(
         error_msg = sanitize_exception_message(e)
         logger.error(
             "ai_assist_error",
-            user_id=str(user.id) if user else "unknown",
+            user_id=user_id,
             error=error_msg,
             exc_info=True
         )
@@ -63,51 +63,50 @@ async def test_jellyfin_connection(
         server_url, validated_ips = await validate_connector_url(server_url, connector_type="Jellyfin")
 
         # Initialize connector using validated IPs to prevent DNS rebinding
-        jellyfin_client = JellyfinConnector(
+        async with JellyfinConnector(
             server_url=server_url,
             api_key=request.api_key,
             user_id=request.user_id,
             validated_ips=validated_ips,
-        )
+        ) as jellyfin_client:
+            # Test connection
+            success, error = await jellyfin_client.test_connection()
+
+            if not success:
+                return JellyfinTestResponse(
+                    success=False,
+                    message=f"Connection failed: {error}",
+                )
+
+            # Get server info for response using validated IPs to prevent DNS rebinding
+            info, info_error = await jellyfin_client.get_server_info(max_retries=0)
+            if info:
+                server_name = info.get("ServerName", "Unknown")
+                version = info.get("Version", "Unknown")
+            else:
+                # If fetching server info fails, continue without it; connection was already tested above.
+                if info_error:
+                    logger.warning(f"Could not fetch Jellyfin server info: {info_error}")
+                server_name = None
+                version = None
+
+            # Get users if no user_id specified (helps user select one)
+            users = None
+            if not request.user_id:
+                users_list, _ = await jellyfin_client.get_users()
+                if users_list:
+                    users = [
+                        {"id": u.get("Id"), "name": u.get("Name")} for u in users_list
+                    ]
 
-        # Test connection
-        success, error = await jellyfin_client.test_connection()
-
-        if not success:
             return JellyfinTestResponse(
-                success=False,
-                message=f"Connection failed: {error}",
+                success=True,
+                message="Connection successful",
+                server_name=server_name,
+                version=version,
+                users=users,
             )
 
-        # Get server info for response using validated IPs to prevent DNS rebinding
-        info, info_error = await jellyfin_client.get_server_info()
-        if info:
-            server_name = info.get("ServerName", "Unknown")
-            version = info.get("Version", "Unknown")
-        else:
-            # If fetching server info fails, continue without it; connection was already tested above.
-                        if info_error:
-                                            logger.warning(f"Could not fetch Jellyfin server info: {info_error}")
-            server_name = None
-            version = None
-
-        # Get users if no user_id specified (helps user select one)
-        users = None
-        if not request.user_id:
-            users_list, _ = await jellyfin_client.get_users()
-            if users_list:
-                users = [
-                    {"id": u.get("Id"), "name": u.get("Name")} for u in users_list
-                ]
-
-        return JellyfinTestResponse(
-            success=True,
-            message="Connection successful",
-            server_name=server_name,
-            version=version,
-            users=users,
-        )
-
     except Exception as e:
         logger.error(f"Error testing Jellyfin connection: {e!s}", exc_info=True)
         raise HTTPException(
@@ -145,15 +144,14 @@ async def add_jellyfin_connector(
         server_url, validated_ips = await validate_connector_url(server_url, connector_type="Jellyfin")
 
         # Initialize connector using validated IPs to prevent DNS rebinding
-        jellyfin_client = JellyfinConnector(
+        async with JellyfinConnector(
             server_url=server_url,
             api_key=request.api_key,
             user_id=request.user_id,
             validated_ips=validated_ips,
-        )
-
-        # Test connection
-        success, error = await jellyfin_client.test_connection()
+        ) as jellyfin_client:
+            # Test connection
+            success, error = await jellyfin_client.test_connection()
 
         if not success:
             raise HTTPException(
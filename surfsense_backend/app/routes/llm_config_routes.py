@@ -13,6 +13,7 @@ from app.db import (
     UserSearchSpacePreference,
     get_async_session,
 )
+from app.routes.assist import invalidate_user_llm_cache
 from app.schemas import (
     LLMConfigCreate,
     LLMConfigRead,
@@ -301,6 +302,7 @@ async def update_llm_config(
 
         await session.commit()
         await session.refresh(db_llm_config)
+        invalidate_user_llm_cache()
         return db_llm_config
     except HTTPException:
         raise
@@ -333,6 +335,7 @@ async def delete_llm_config(
 
         await session.delete(db_llm_config)
         await session.commit()
+        invalidate_user_llm_cache()
         return {"message": "LLM configuration deleted successfully"}
     except HTTPException:
         raise
@@ -503,6 +506,7 @@ async def update_user_llm_preferences(
 
         await session.commit()
         await session.refresh(preference)
+        invalidate_user_llm_cache(user.id)
 
         # Helper function to get config (global or custom)
         async def get_config_for_id(config_id):
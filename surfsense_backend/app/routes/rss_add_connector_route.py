@@ -172,13 +172,12 @@ async def validate_multiple_feeds(
             # If URL validation fails, skip it (will be reported as invalid in results)
             validated_urls.append(url)
 
-    connector = RSSConnector(feed_urls=[])
-
-    # Validate all feeds in parallel
+    # Validate all feeds in parallel over one shared client
     # Note: validate_feed never raises exceptions, it returns errors in the result dict
-    results = await asyncio.gather(
-        *[connector.validate_feed(url) for url in validated_urls]
-    )
+    async with RSSConnector(feed_urls=[]) as connector:
+        results = await asyncio.gather(
+            *[connector.validate_feed(url) for url in validated_urls]
+        )
 
     valid_count = sum(1 for r in results if r["valid"])
     invalid_count = len(results) - valid_count
@@ -1,3 +1,4 @@
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,6 +13,12 @@ from app.users import current_active_user
 
 router = APIRouter(prefix="/site-config", tags=["Site Configuration"])
 
+# Cache for the registration toggle (TTL = 60 seconds, max 1 item)
+# Consulted on every registration/OAuth request; cleared by update_site_config()
+# so admin changes take effect immediately in this worker.
+_registration_cache = TTLCache(maxsize=1, ttl=60)
+_REGISTRATION_CACHE_KEY = "disable_registration"
+
 
 async def get_or_create_config(db: AsyncSession) -> SiteConfiguration:
     """Get the site configuration (singleton), creating it if it doesn't exist."""
@@ -29,6 +36,26 @@ async def get_or_create_config(db: AsyncSession) -> SiteConfiguration:
     return config
 
 
+async def is_registration_disabled(db: AsyncSession) -> bool:
+    """Return the site-wide disable_registration flag, served from cache when fresh."""
+    disabled = _registration_cache.get(_REGISTRATION_CACHE_KEY)
+    if disabled is None:
+        # Cache miss - fetch only the flag, not the whole configuration row
+        result = await db.execute(
+            select(SiteConfiguration.disable_registration).where(
+                SiteConfiguration.id == 1
+            )
+        )
+        disabled = bool(result.scalar_one_or_none())
+        _registration_cache[_REGISTRATION_CACHE_KEY] = disabled
+    return disabled
+
+
+def invalidate_registration_cache() -> None:
+    """Drop the cached registration flag so the next check reads the database."""
+    _registration_cache.clear()
+
+
 @router.get("/public", response_model=SiteConfigurationPublic)
 async def get_public_site_config(
     db: AsyncSession = Depends(get_async_session),
@@ -82,4 +109,5 @@ async def update_site_config(
 
     await db.commit()
     await db.refresh(config)
+    invalidate_registration_cache()
     return config
@@ -65,7 +65,7 @@ from .search_space import (
     SearchSpaceUpdate,
     ShareSpaceResponse,
 )
-from .users import UserCreate, UserRead, UserUpdate
+from .users import UserCreate, UserRead, UserUpdate, VerifyTokenResponse
 
 __all__ = [
     "AISDKChatRequest",
@@ -125,5 +125,6 @@ __all__ = [
     "UserCreate",
     "UserRead",
     "UserUpdate",
+    "VerifyTokenResponse",
     "VideoCompressionMetadata",
 ]
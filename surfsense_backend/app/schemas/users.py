@@ -1,7 +1,7 @@
 import uuid
 
 from fastapi_users import schemas
-from pydantic import field_validator
+from pydantic import BaseModel, field_validator
 
 from app.utils.password_validator import validate_password
 
@@ -11,6 +11,13 @@ class UserRead(schemas.BaseUser[uuid.UUID]):
     pages_used: int
 
 
+class VerifyTokenResponse(BaseModel):
+    """Response body of GET /verify-token."""
+
+    valid: bool
+    user: UserRead
+
+
 class UserCreate(schemas.BaseUserCreate):
     """
     User creation schema with password validation.
@@ -18,11 +18,14 @@ Usage:
     )
 """
 
+from collections.abc import Mapping
 from typing import Any
 
 import jsonata
 from jsonata import JException as JsonataError
 
+from app.config.jsonata_templates import CONNECTOR_TEMPLATES
+
 
 class JSONataTransformer:
     """Service for applying JSONata transformations to connector data."""
@@ -61,6 +64,19 @@ class JSONataTransformer:
                 f"Invalid JSONata expression for connector '{connector_type}': {str(e)}"
             ) from e
 
+    def register_templates(self, templates: Mapping[str, str]) -> None:
+        """
+        Register and pre-compile several templates at once.
+
+        Args:
+            templates: Mapping of connector type to JSONata expression
+
+        Raises:
+            ValueError: If any JSONata expression is invalid
+        """
+        for connector_type, jsonata_expression in templates.items():
+            self.register_template(connector_type, jsonata_expression)
+
     def transform(
         self, connector_type: str, data: dict[str, Any]
     ) -> dict[str, Any] | list[dict[str, Any]]:
@@ -83,12 +99,12 @@ class JSONataTransformer:
             ...     "body": "Description..."
             ... })
         """
-        if connector_type not in self.templates:
+        # Use pre-compiled expression (no compilation overhead)
+        compiled_expression = self.templates.get(connector_type)
+        if compiled_expression is None:
             # Fallback: return original data if no template registered
             return data
 
-        # Use pre-compiled expression (no compilation overhead)
-        compiled_expression = self.templates[connector_type]
         try:
             return compiled_expression.evaluate(data)
         except JsonataError as e:
@@ -152,6 +168,7 @@ class JSONataTransformer:
 
 
 # Global transformer instance
-# This singleton is initialized on application startup and templates are registered
-# from the jsonata_templates configuration module
+# The connector templates are static, so they are compiled once at import time
+# and the first request never pays the compilation cost
 transformer = JSONataTransformer()
+transformer.register_templates(CONNECTOR_TEMPLATES)
@@ -0,0 +1,241 @@
+"""Retention maintenance for conversation persistence tables.
+
+conversation_messages is range-partitioned by month on ``timestamp`` (see
+alembic revision 49). Keeping it healthy means creating partitions ahead of
+time and retiring whole partitions once they fall outside the retention
+window, which is O(1) compared to a row-by-row DELETE followed by vacuum.
+Rows outside every monthly range sit in a DEFAULT partition until a monthly
+partition covering them is created.
+
+conversation_checkpoints is not partitioned, so it is pruned with bounded
+DELETE batches, each in its own short transaction, to keep locks and WAL
+small.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+MESSAGES_TABLE = "conversation_messages"
+PARTITION_MONTHS_AHEAD = 3
+DEFAULT_PARTITION = f"{MESSAGES_TABLE}_default"
+
+_PARTITION_NAME_RE = re.compile(rf"^{MESSAGES_TABLE}_(\d{{4}})_(\d{{2}})$")
+
+_DELETE_EXPIRED_CHECKPOINTS = text(
+    "DELETE FROM conversation_checkpoints WHERE id IN ("
+    "SELECT id FROM conversation_checkpoints WHERE timestamp < :cutoff "
+    "LIMIT :batch_size)"
+)
+
+_DELETE_EXCESS_CHECKPOINTS = text(
+    "DELETE FROM conversation_checkpoints WHERE id IN ("
+    "SELECT id FROM ("
+    "SELECT id, row_number() OVER ("
+    "PARTITION BY conversation_id ORDER BY timestamp DESC) AS position "
+    "FROM conversation_checkpoints) ranked "
+    "WHERE position > :keep_count LIMIT :batch_size)"
+)
+
+
+def _add_months(month_start: date, months: int) -> date:
+    """Return the first day of the month ``months`` after ``month_start``."""
+    years, month_index = divmod(month_start.month - 1 + months, 12)
+    return date(month_start.year + years, month_index + 1, 1)
+
+
+def _partition_name(month_start: date) -> str:
+    return f"{MESSAGES_TABLE}_{month_start:%Y_%m}"
+
+
+async def ensure_message_partitions(
+    conn: AsyncConnection,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+) -> list[str]:
+    """Create monthly partitions from the current month up to ``months_ahead``.
+
+    Postgres refuses to create a partition whose range overlaps rows already
+    in the DEFAULT partition, so the default is detached first, its rows for
+    each new month are moved into that month's partition, and it is attached
+    again afterwards.
+
+    Args:
+        conn: Open connection inside a transaction
+        months_ahead: Number of future months to pre-create
+
+    Returns:
+        list: Names of the partitions that did not exist before
+    """
+    current = datetime.now(UTC).date().replace(day=1)
+    existing = set(await _list_message_partitions(conn))
+    missing = [
+        _add_months(current, offset)
+        for offset in range(months_ahead + 1)
+        if _partition_name(_add_months(current, offset)) not in existing
+    ]
+    if not missing:
+        return []
+
+    has_default = DEFAULT_PARTITION in existing
+    if has_default:
+        await conn.execute(
+            text(f"ALTER TABLE {MESSAGES_TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+        )
+
+    created = []
+    for month_start in missing:
+        name = _partition_name(month_start)
+        lower = month_start.isoformat()
+        upper = _add_months(month_start, 1).isoformat()
+        await conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {MESSAGES_TABLE} "
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+        )
+        if has_default:
+            await conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE timestamp >= '{lower}' AND timestamp < '{upper}' "
+                    f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+                )
+            )
+        created.append(name)
+
+    if has_default:
+        await conn.execute(
+            text(
+                f"ALTER TABLE {MESSAGES_TABLE} ATTACH PARTITION "
+                f"{DEFAULT_PARTITION} DEFAULT"
+            )
+        )
+    logger.info(f"Created message partitions: {', '.join(created)}")
+    return created
+
+
+async def drop_expired_message_partitions(
+    conn: AsyncConnection,
+    retention_days: int,
+) -> list[str]:
+    """Detach and drop partitions whose whole range is older than the cutoff.
+
+    A partition is only retired once its upper bound is at or before
+    ``now() - retention_days``, so no row inside the retention window is lost.
+    The DEFAULT partition is never dropped; its expired rows are deleted.
+
+    Args:
+        conn: Open connection inside a transaction
+        retention_days: Number of days of messages to keep
+
+    Returns:
+        list: Names of the dropped partitions
+    """
+    cutoff = datetime.now(UTC).date() - timedelta(days=retention_days)
+    dropped = []
+    for name in await _list_message_partitions(conn):
+        if name == DEFAULT_PARTITION:
+            await conn.execute(
+                text(
+                    f"DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE timestamp < '{cutoff.isoformat()}'"
+                )
+            )
+            continue
+        match = _PARTITION_NAME_RE.match(name)
+        if not match:
+            continue
+        month_start = date(int(match.group(1)), int(match.group(2)), 1)
+        if _add_months(month_start, 1) > cutoff:
+            continue
+        await conn.execute(
+            text(f"ALTER TABLE {MESSAGES_TABLE} DETACH PARTITION {name}")
+        )
+        await conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    if dropped:
+        logger.info(f"Dropped expired message partitions: {', '.join(dropped)}")
+    return dropped
+
+
+async def _list_message_partitions(conn: AsyncConnection) -> list[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :parent ORDER BY child.relname"
+        ),
+        {"parent": MESSAGES_TABLE},
+    )
+    return list(result.scalars().all())
+
+
+async def cleanup_expired_checkpoints(
+    engine: AsyncEngine,
+    retention_days: int,
+    batch_size: int,
+) -> int:
+    """Delete conversation checkpoints older than the retention window in batches.
+
+    Args:
+        engine: Engine to open one short transaction per batch on
+        retention_days: Number of days of checkpoints to keep
+        batch_size: Maximum rows deleted per transaction
+
+    Returns:
+        int: Total number of checkpoints deleted
+    """
+    cutoff = datetime.now(UTC) - timedelta(days=retention_days)
+    return await _delete_in_batches(
+        engine,
+        _DELETE_EXPIRED_CHECKPOINTS,
+        {"cutoff": cutoff, "batch_size": batch_size},
+        batch_size,
+    )
+
+
+async def trim_conversation_checkpoints(
+    engine: AsyncEngine,
+    keep_count: int,
+    batch_size: int,
+) -> int:
+    """Enforce a per-conversation checkpoint cap, keeping the most recent ones.
+
+    Args:
+        engine: Engine to open one short transaction per batch on
+        keep_count: Number of most recent checkpoints kept per conversation
+        batch_size: Maximum rows deleted per transaction
+
+    Returns:
+        int: Total number of checkpoints deleted
+    """
+    return await _delete_in_batches(
+        engine,
+        _DELETE_EXCESS_CHECKPOINTS,
+        {"keep_count": keep_count, "batch_size": batch_size},
+        batch_size,
+    )
+
+
+async def _delete_in_batches(
+    engine: AsyncEngine,
+    statement,
+    params: dict,
+    batch_size: int,
+) -> int:
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(statement, params)
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+        # Let other tasks on the loop run between batches
+        await asyncio.sleep(0)
@@ -18,6 +18,10 @@ class MessageCheckpointer:
     
     This class wraps LangGraph's AsyncPostgresSaver to provide checkpoint-based
     state management for conversation history and agent state recovery.
+
+    Writes are left to the saver, which already batches them: aput_writes
+    sends all pending channel writes of a step as one pipelined executemany
+    (INSERT ... ON CONFLICT DO UPDATE) instead of one round-trip per write.
     """
 
 
@@ -196,23 +200,18 @@ class MessageCheckpointer:
             thread_id: Unique identifier for the conversation thread
             checkpoint_id: ID of the checkpoint to delete
             
-        Returns:
-This method is not yet implemented and will raise NotImplementedError.            
         Raises:
-            RuntimeError: If checkpoint deletion fails
+            RuntimeError: If the checkpointer is not initialized
+            NotImplementedError: Checkpoint deletion is not yet implemented
         """
         if not self.saver:
             raise RuntimeError("Message checkpointer not initialized")
-        
-        try:
-            async with self.get_saver() as saver:
-                logger.info(f"Checkpoint deletion requested for {thread_id}:{checkpoint_id}")
-raise NotImplementedError(
-                "Checkpoint deletion is not yet implemented. "
-                "This method requires proper cascade deletion support in the database layer."
-            )        except Exception as e:
-            logger.error(f"Failed to delete checkpoint {checkpoint_id}: {e}")
-            raise RuntimeError(f"Checkpoint deletion failed: {e}") from e
+
+        logger.info(f"Checkpoint deletion requested for {thread_id}:{checkpoint_id}")
+        raise NotImplementedError(
+            "Checkpoint deletion is not yet implemented. "
+            "This method requires proper cascade deletion support in the database layer."
+        )
 
     async def cleanup_old_checkpoints(
         self,
@@ -279,17 +278,18 @@ async def get_checkpointer(
     
     if _checkpointer_instance is None:
         try:
-                from app.config.persistence import get_config            
-                config = get_config()
-                db_url = connection_string or config.database_url
-                _checkpointer_instance = MessageCheckpointer(
-                    connection_string=db_url,
-                    pool_size=config.pool_size,
-                    max_overflow=config.max_overflow,
-                )
-                await _checkpointer_instance.initialize()
-                _initialized = True
-                            logger.info("Global checkpointer instance initialized")
+            from app.config.persistence import get_config
+
+            config = get_config()
+            db_url = connection_string or config.database_url
+            _checkpointer_instance = MessageCheckpointer(
+                connection_string=db_url,
+                pool_size=config.pool_size,
+                max_overflow=config.max_overflow,
+            )
+            await _checkpointer_instance.initialize()
+            _initialized = True
+            logger.info("Global checkpointer instance initialized")
         except Exception as e:
             logger.error(f"Failed to initialize global checkpointer: {e}")
             raise RuntimeError(f"Global checkpointer initialization failed: {e}") from e
@@ -0,0 +1,68 @@
+"""Nightly retention maintenance for conversation persistence tables."""
+
+import logging
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.celery_app import celery_app
+from app.db import persistence_config
+from app.services.persistence.checkpoint_retention import (
+    cleanup_expired_checkpoints,
+    drop_expired_message_partitions,
+    ensure_message_partitions,
+    trim_conversation_checkpoints,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="maintain_checkpoint_retention")
+def maintain_checkpoint_retention_task():
+    """
+    Roll the conversation_messages partition window forward, retire
+    partitions older than the configured checkpoint retention and prune
+    conversation_checkpoints in bounded batches.
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        loop.run_until_complete(_maintain_checkpoint_retention())
+    finally:
+        loop.close()
+
+
+async def _maintain_checkpoint_retention():
+    engine = create_async_engine(
+        persistence_config.engine_url,
+        poolclass=NullPool,
+        connect_args=persistence_config.connect_args,
+        echo=False,
+    )
+    try:
+        async with engine.begin() as conn:
+            await ensure_message_partitions(conn)
+            await drop_expired_message_partitions(
+                conn, persistence_config.checkpoint_retention_days
+            )
+        expired = await cleanup_expired_checkpoints(
+            engine,
+            persistence_config.checkpoint_retention_days,
+            persistence_config.cleanup_batch_size,
+        )
+        trimmed = await trim_conversation_checkpoints(
+            engine,
+            persistence_config.max_checkpoints_per_conversation,
+            persistence_config.cleanup_batch_size,
+        )
+        logger.info(
+            f"Checkpoint cleanup removed {expired} expired and {trimmed} excess checkpoints"
+        )
+    except Exception as e:
+        logger.error(f"Checkpoint retention maintenance failed: {e!s}")
+        raise
+    finally:
+        await engine.dispose()
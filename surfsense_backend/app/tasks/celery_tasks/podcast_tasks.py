@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
 from app.celery_app import celery_app
-from app.config import config
+from app.db import persistence_config
 from app.tasks.podcast_tasks import generate_chat_podcast
 
 logger = logging.getLogger(__name__)
@@ -29,8 +29,9 @@ def get_celery_session_maker():
     and the default session maker is bound to the main app's event loop.
     """
     engine = create_async_engine(
-        config.DATABASE_URL,
+        persistence_config.engine_url,
         poolclass=NullPool,  # Don't use connection pooling for Celery tasks
+        connect_args=persistence_config.connect_args,
         echo=False,
     )
     return async_sessionmaker(engine, expire_on_commit=False)
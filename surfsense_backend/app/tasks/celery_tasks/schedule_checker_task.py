@@ -8,8 +8,11 @@ from sqlalchemy.future import select
 from sqlalchemy.pool import NullPool
 
 from app.celery_app import celery_app
-from app.config import config
-from app.db import SearchSourceConnector, SearchSourceConnectorType
+from app.db import (
+    SearchSourceConnector,
+    SearchSourceConnectorType,
+    persistence_config,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +20,9 @@ logger = logging.getLogger(__name__)
 def get_celery_session_maker():
     """Create async session maker for Celery tasks."""
     engine = create_async_engine(
-        config.DATABASE_URL,
+        persistence_config.engine_url,
         poolclass=NullPool,
+        connect_args=persistence_config.connect_args,
         echo=False,
     )
     return async_sessionmaker(engine, expire_on_commit=False)
@@ -14,6 +14,7 @@ from app.utils.document_converters import (
     generate_content_hash,
     generate_unique_identifier_hash,
 )
+from app.utils.url_validator import validate_connector_url
 
 from .base import (
     check_document_by_unique_identifier,
@@ -96,33 +97,40 @@ async def index_jellyfin_data(
             {"stage": "client_initialization"},
         )
 
-        jellyfin_client = JellyfinConnector(
-            server_url=server_url, api_key=api_key, user_id=jellyfin_user_id
+        # Resolve and vet the stored URL again; DNS may have changed since it was saved
+        server_url, validated_ips = await validate_connector_url(
+            server_url, connector_type="Jellyfin"
         )
 
-        # Test connection
-        connected, connection_error = await jellyfin_client.test_connection()
-        if not connected:
-            await task_logger.log_task_failure(
+        async with JellyfinConnector(
+            server_url=server_url,
+            api_key=api_key,
+            user_id=jellyfin_user_id,
+            validated_ips=validated_ips,
+        ) as jellyfin_client:
+            # Test connection
+            connected, connection_error = await jellyfin_client.test_connection()
+            if not connected:
+                await task_logger.log_task_failure(
+                    log_entry,
+                    f"Failed to connect to Jellyfin: {connection_error}",
+                    "Connection failed",
+                    {"error_type": "ConnectionError"},
+                )
+                return 0, f"Failed to connect to Jellyfin: {connection_error}"
+
+            await task_logger.log_task_progress(
                 log_entry,
-                f"Failed to connect to Jellyfin: {connection_error}",
-                "Connection failed",
-                {"error_type": "ConnectionError"},
+                "Fetching Jellyfin data",
+                {"stage": "fetching_data"},
             )
-            return 0, f"Failed to connect to Jellyfin: {connection_error}"
 
-        await task_logger.log_task_progress(
-            log_entry,
-            "Fetching Jellyfin data",
-            {"stage": "fetching_data"},
-        )
-
-        # Get all indexable data
-        items, fetch_error = await jellyfin_client.get_all_indexable_data(
-            max_items=500,
-            max_favorites=100,
-            max_recently_played=100,
-        )
+            # Get all indexable data
+            items, fetch_error = await jellyfin_client.get_all_indexable_data(
+                max_items=500,
+                max_favorites=100,
+                max_recently_played=100,
+            )
 
         if fetch_error:
             logger.warning(f"Some data fetch errors occurred: {fetch_error}")
@@ -2,10 +2,11 @@
 RSS Feed connector indexer.
 """
 
-from datetime import datetime
+from datetime import UTC, datetime
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import flag_modified
 
 from app.config import config
 from app.connectors.rss_connector import RSSConnector
@@ -25,6 +26,54 @@ from .base import (
 )
 
 
+def _store_feed_validators(
+    connector, feed_validators: dict, incomplete_feeds: set[str] | None = None
+) -> None:
+    """
+    Save conditional-GET validators on the connector for the next run.
+
+    A feed whose entries were not all indexed (filtered out by date, or
+    failed) keeps no validators: the next run would otherwise get a 304 with
+    no entries and never see the missed ones until the feed changes.
+
+    Args:
+        connector: RSS connector whose config holds the validators
+        feed_validators: Validators per feed URL from the RSS client
+        incomplete_feeds: Feed URLs with a skipped or failed entry this run
+    """
+    feed_validators = {
+        url: validators
+        for url, validators in feed_validators.items()
+        if url not in (incomplete_feeds or ())
+    }
+    if connector.config.get("FEED_VALIDATORS") == feed_validators:
+        return
+    connector.config["FEED_VALIDATORS"] = feed_validators
+    flag_modified(connector, "config")
+
+
+def _parse_utc(value: str) -> datetime:
+    """Parse an ISO date or datetime, reading naive values as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _outside_date_range(
+    entry: dict, filter_start: datetime | None, filter_end: datetime | None
+) -> bool:
+    """Whether an entry's published date falls outside the requested range."""
+    if not entry.get("published"):
+        return False
+    try:
+        entry_date = _parse_utc(entry["published"])
+    except (ValueError, TypeError):
+        return False  # Skip date filtering if parse fails
+    return bool(
+        (filter_start and entry_date < filter_start)
+        or (filter_end and entry_date > filter_end)
+    )
+
+
 async def index_rss_feeds(
     session: AsyncSession,
     connector_id: int,
@@ -98,19 +147,24 @@ async def index_rss_feeds(
             {"stage": "client_initialization", "feed_count": len(feed_urls)},
         )
 
-        rss_client = RSSConnector(feed_urls=feed_urls)
+        # ETag/Last-Modified validators from the previous run let unchanged
+        # feeds answer 304 without a body
+        rss_client = RSSConnector(
+            feed_urls=feed_urls,
+            feed_validators=connector.config.get("FEED_VALIDATORS"),
+        )
 
         # Parse date filters
         filter_start = None
         filter_end = None
         if start_date:
             try:
-                filter_start = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
+                filter_start = _parse_utc(start_date)
             except ValueError:
                 logger.warning(f"Invalid start_date format: {start_date}")
         if end_date:
             try:
-                filter_end = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+                filter_end = _parse_utc(end_date)
             except ValueError:
                 logger.warning(f"Invalid end_date format: {end_date}")
 
@@ -124,12 +178,13 @@ async def index_rss_feeds(
         entries = await rss_client.fetch_all_feeds()
 
         if not entries:
+            _store_feed_validators(connector, rss_client.feed_validators)
             logger.info("No entries found to index from RSS feeds")
             if update_last_indexed:
                 await update_connector_last_indexed(
                     session, connector, update_last_indexed
                 )
-                await session.commit()
+            await session.commit()
 
             await task_logger.log_task_success(
                 log_entry,
@@ -147,21 +202,15 @@ async def index_rss_feeds(
         # Process each entry
         documents_indexed = 0
         duplicates_skipped = 0
+        # Feeds with an entry that was not indexed this run
+        incomplete_feeds: set[str] = set()
 
         for entry in entries:
             try:
                 # Apply date filters
-                if entry.get("published"):
-                    try:
-                        entry_date = datetime.fromisoformat(
-                            entry["published"].replace("Z", "+00:00")
-                        )
-                        if filter_start and entry_date < filter_start:
-                            continue
-                        if filter_end and entry_date > filter_end:
-                            continue
-                    except (ValueError, TypeError):
-                        pass  # Skip date filtering if parse fails
+                if _outside_date_range(entry, filter_start, filter_end):
+                    incomplete_feeds.add(entry.get("feed_url", ""))
+                    continue
 
                 # Use the unique_id from the connector for deduplication
                 unique_id = entry.get("unique_id", "")
@@ -251,8 +300,11 @@ async def index_rss_feeds(
 
             except Exception as e:
                 logger.error(f"Error processing entry {entry.get('title', 'unknown')}: {e!s}")
+                incomplete_feeds.add(entry.get("feed_url", ""))
                 continue
 
+        _store_feed_validators(connector, rss_client.feed_validators, incomplete_feeds)
+
         # Update last indexed timestamp
         if update_last_indexed:
             await update_connector_last_indexed(session, connector, update_last_indexed)
@@ -7,6 +7,8 @@ information, making logs easier to parse and analyze in production environments.
 
 import logging
 import sys
+from collections.abc import Callable
+from typing import Any
 
 import structlog
 
@@ -139,3 +141,31 @@ def clear_request_context() -> None:
         >>> clear_request_context()
     """
     structlog.contextvars.clear_contextvars()
+
+
+class LazyLogValue:
+    """
+    Defer computing a log field until the record is actually rendered.
+
+    Expensive values (sanitized payloads, tracebacks) are only computed when
+    the entry survives level filtering and reaches the renderer. structlog's
+    JSONRenderer resolves unknown objects through ``__structlog__``; plain
+    ``str()``/``repr()`` conversions resolve the same way.
+
+    Example:
+        >>> logger.warning("validation_failed", errors=LazyLogValue(sanitize_data, errors))
+    """
+
+    __slots__ = ("_args", "_func")
+
+    def __init__(self, func: Callable[..., Any], *args: Any) -> None:
+        self._func = func
+        self._args = args
+
+    def __structlog__(self) -> Any:
+        return self._func(*self._args)
+
+    def __str__(self) -> str:
+        return str(self._func(*self._args))
+
+    __repr__ = __str__
@@ -0,0 +1,169 @@
+"""
+Unit tests for the AI assist response cache, request coalescing and stream
+batching.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.routes import assist
+
+KEY = ("improve", "some text", "")
+
+
+@pytest.fixture(autouse=True)
+def clear_state():
+    assist._response_cache.clear()
+    assist._inflight.clear()
+    yield
+    assist._response_cache.clear()
+    assist._inflight.clear()
+
+
+class FakeLLM:
+    """LLM stand-in whose astream yields fixed chunks, then optionally raises."""
+
+    def __init__(self, chunks: list[str], error: Exception | None = None):
+        self.chunks = chunks
+        self.error = error
+
+    async def astream(self, prompt: str):
+        for chunk in self.chunks:
+            yield Mock(content=chunk)
+        if self.error is not None:
+            raise self.error
+
+
+def _stream(llm: FakeLLM):
+    request = assist.AssistRequest(user_input="some text", command="improve")
+    return assist.stream_llm_response(llm, "prompt", KEY, request, "user", 0.0)
+
+
+async def _drain(stream) -> list:
+    return [data async for data in stream]
+
+
+@pytest.mark.asyncio
+async def test_waiter_receives_owner_body():
+    """Test that an identical request gets the streaming request's response."""
+    release = asyncio.Event()
+
+    async def owner_stream():
+        yield b"hello"
+        await release.wait()
+        await assist.store_response(KEY, b"hello", "owner")
+
+    owner = asyncio.create_task(_drain(assist.coalesce_stream(KEY, owner_stream())))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(assist.await_inflight_response(KEY, "waiter"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == b"hello"
+    assert await owner == [b"hello"]
+    assert not assist._inflight
+
+
+@pytest.mark.asyncio
+async def test_owner_failure_lets_waiter_fall_back():
+    """Test that a failed owner releases waiters with None so they call the LLM."""
+    release = asyncio.Event()
+
+    async def failing_stream():
+        yield b"partial"
+        await release.wait()
+        raise RuntimeError("stream broke")
+
+    owner = asyncio.create_task(_drain(assist.coalesce_stream(KEY, failing_stream())))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(assist.await_inflight_response(KEY, "waiter"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter is None
+    with pytest.raises(RuntimeError):
+        await owner
+    assert not assist._inflight
+
+
+@pytest.mark.asyncio
+async def test_owner_disconnect_releases_waiter():
+    """Test that closing the owner's stream early still releases waiters."""
+    owner = assist.coalesce_stream(KEY, _stream(FakeLLM(["a" * 600, "b"])))
+    assert await owner.__anext__()
+    waiter = asyncio.create_task(assist.await_inflight_response(KEY, "waiter"))
+    await asyncio.sleep(0)
+
+    await owner.aclose()
+
+    assert await waiter is None
+    assert not assist._inflight
+
+
+@pytest.mark.asyncio
+async def test_oversized_response_is_not_shared(monkeypatch):
+    """Test that a response over the cache limit is neither cached nor shared."""
+    monkeypatch.setattr(assist, "CACHE_MAX_RESPONSE_BYTES", 4)
+    owner = assist.coalesce_stream(KEY, _stream(FakeLLM(["too ", "large"])))
+    first = await owner.__anext__()
+    waiter = asyncio.create_task(assist.await_inflight_response(KEY, "waiter"))
+    await asyncio.sleep(0)
+
+    rest = await _drain(owner)
+
+    assert b"".join([first, *rest]) == b"too large"
+    assert await waiter is None
+    assert KEY not in assist._response_cache
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_fills_memory_tier(monkeypatch):
+    """Test that a Redis hit is served and copied into the worker cache."""
+    redis = Mock(get=AsyncMock(return_value=b"from redis"))
+    monkeypatch.setattr(assist, "REDIS_CACHE_ENABLED", True)
+    monkeypatch.setattr(assist, "get_redis_client", Mock(return_value=redis))
+
+    assert await assist.get_cached_response(KEY, "user") == b"from redis"
+    assert assist._response_cache[KEY] == b"from redis"
+
+    assert await assist.get_cached_response(KEY, "user") == b"from redis"
+    redis.get.assert_awaited_once_with(assist.redis_cache_key(KEY))
+
+
+@pytest.mark.asyncio
+async def test_redis_error_counts_as_miss(monkeypatch):
+    """Test that an unreachable Redis does not fail the request."""
+    redis = Mock(get=AsyncMock(side_effect=ConnectionError("down")))
+    monkeypatch.setattr(assist, "REDIS_CACHE_ENABLED", True)
+    monkeypatch.setattr(assist, "get_redis_client", Mock(return_value=redis))
+
+    assert await assist.get_cached_response(KEY, "user") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_batches_by_size(monkeypatch):
+    """Test that chunks are sent once STREAM_FLUSH_BYTES have accumulated."""
+    monkeypatch.setattr(assist, "STREAM_FLUSH_BYTES", 4)
+    monkeypatch.setattr(assist, "STREAM_FLUSH_SECONDS", 60)
+
+    batches = await _drain(_stream(FakeLLM(["ab", "cd", "ef", "g"])))
+
+    assert batches == [b"abcd", b"efg"]
+    assert assist._response_cache[KEY] == b"abcdefg"
+
+
+@pytest.mark.asyncio
+async def test_stream_flushes_remainder_before_error_note(monkeypatch):
+    """Test that batched output reaches the client ahead of the error note."""
+    monkeypatch.setattr(assist, "STREAM_FLUSH_BYTES", 4)
+    monkeypatch.setattr(assist, "STREAM_FLUSH_SECONDS", 60)
+
+    batches = await _drain(
+        _stream(FakeLLM(["ab", "cd", "e"], error=RuntimeError("boom")))
+    )
+
+    assert batches[:2] == [b"abcd", b"e"]
+    assert batches[2].startswith("\n\n[Error:")
+    assert KEY not in assist._response_cache
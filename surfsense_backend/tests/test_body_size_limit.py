@@ -0,0 +1,50 @@
+"""Tests for the Content-Length based request body limit."""
+
+import pytest
+from starlette.responses import PlainTextResponse
+
+from app.middleware.body_size import BodySizeLimitMiddleware
+
+
+async def _downstream(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+async def _call(path: str, headers: list[tuple[bytes, bytes]]) -> int:
+    middleware = BodySizeLimitMiddleware(_downstream, limits={"/api/v1/assist": 100})
+    scope = {"type": "http", "method": "POST", "path": path, "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0]["status"]
+
+
+@pytest.mark.asyncio
+async def test_oversized_body_is_rejected():
+    """Test that a declared body over the limit gets 413 without reaching the app."""
+    assert await _call("/api/v1/assist/", [(b"content-length", b"101")]) == 413
+
+
+@pytest.mark.asyncio
+async def test_body_within_limit_passes():
+    """Test that bodies at the limit or without a length reach the app."""
+    assert await _call("/api/v1/assist/", [(b"content-length", b"100")]) == 200
+    assert await _call("/api/v1/assist/", []) == 200
+
+
+@pytest.mark.asyncio
+async def test_invalid_content_length_is_rejected():
+    """Test that a non-numeric Content-Length is treated as oversized."""
+    assert await _call("/api/v1/assist/", [(b"content-length", b"-1")]) == 413
+
+
+@pytest.mark.asyncio
+async def test_other_paths_are_not_limited():
+    """Test that paths outside the configured prefixes are untouched."""
+    assert await _call("/api/v1/documents", [(b"content-length", b"999999")]) == 200
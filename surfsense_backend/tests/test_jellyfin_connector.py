@@ -0,0 +1,207 @@
+"""
+Unit tests for the Jellyfin connector.
+"""
+
+import importlib
+from unittest.mock import AsyncMock
+
+import pytest
+
+
+def test_jellyfin_modules_import():
+    """Test that the connector and its route modules load without syntax errors."""
+    importlib.import_module("app.connectors.jellyfin_connector")
+    importlib.import_module("app.routes.jellyfin_add_connector_route")
+
+
+def test_connector_requires_validated_ips():
+    """Test that the connector refuses to start without pinned IPs."""
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    with pytest.raises(ValueError, match="validated_ips"):
+        JellyfinConnector(server_url="https://jellyfin.example.com", api_key="key")
+
+
+def test_connector_rejects_private_validated_ip():
+    """Test that a non-public pinned IP is refused when the connector is built."""
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    with pytest.raises(ValueError, match="non-public"):
+        JellyfinConnector(
+            server_url="https://jellyfin.example.com",
+            api_key="key",
+            validated_ips=["192.168.1.10"],
+        )
+
+
+def test_client_addresses_hostname_not_ip():
+    """Test that requests target the real hostname so TLS SNI and pooling use it."""
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    connector = JellyfinConnector(
+        server_url="https://jellyfin.example.com:8920/",
+        api_key="key",
+        validated_ips=["93.184.216.34"],
+    )
+
+    assert connector._client.base_url.host == "jellyfin.example.com"
+    assert connector._client.base_url.port == 8920
+    assert connector._client.headers["X-Emby-Token"] == "key"
+
+
+@pytest.mark.asyncio
+async def test_pinned_backend_dials_validated_ip():
+    """Test that connections to the host go to the pinned IP and other hosts are refused."""
+    import httpcore
+
+    from app.connectors.jellyfin_connector import _PinnedHostBackend
+
+    backend = _PinnedHostBackend("jellyfin.example.com", "93.184.216.34")
+    backend._backend = AsyncMock()
+
+    await backend.connect_tcp("jellyfin.example.com", 443)
+    assert backend._backend.connect_tcp.await_args.args == ("93.184.216.34", 443)
+
+    with pytest.raises(httpcore.ConnectError):
+        await backend.connect_tcp("attacker.example.com", 443)
+
+
+@pytest.mark.asyncio
+async def test_pinned_backend_matches_idna_hostname():
+    """Test that a Unicode hostname matches the ASCII form httpcore dials."""
+    from app.connectors.jellyfin_connector import _PinnedHostBackend
+
+    backend = _PinnedHostBackend("bücher.example.com", "93.184.216.34")
+    backend._backend = AsyncMock()
+
+    await backend.connect_tcp("xn--bcher-kva.example.com", 443)
+    assert backend._backend.connect_tcp.await_args.args == ("93.184.216.34", 443)
+
+
+@pytest.mark.asyncio
+async def test_test_connection_does_not_retry():
+    """Test that connection validation fails fast instead of backing off."""
+    import httpx
+
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    connector = JellyfinConnector(
+        server_url="https://jellyfin.example.com",
+        api_key="key",
+        validated_ips=["93.184.216.34"],
+    )
+    connector._client.request = AsyncMock(side_effect=httpx.ConnectError("refused"))
+
+    success, error = await connector.test_connection()
+
+    assert success is False
+    assert "Connection failed" in error
+    assert connector._client.request.await_count == 1
+    await connector.aclose()
+
+
+@pytest.mark.asyncio
+async def test_iter_items_pages_until_short_page():
+    """Test that iter_items requests pages until the server returns a short one."""
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    connector = JellyfinConnector(
+        server_url="https://jellyfin.example.com",
+        api_key="key",
+        validated_ips=["93.184.216.34"],
+    )
+    connector.get_items = AsyncMock(
+        side_effect=[
+            ([{"Id": "1"}, {"Id": "2"}], 3, None),
+            ([{"Id": "3"}], 3, None),
+        ]
+    )
+
+    items = [item async for item in connector.iter_items(page_size=2)]
+
+    assert [item["Id"] for item in items] == ["1", "2", "3"]
+    assert [c.kwargs["start_index"] for c in connector.get_items.await_args_list] == [0, 2]
+    await connector.aclose()
+
+
+@pytest.mark.asyncio
+async def test_indexable_data_merges_sources_without_duplicates():
+    """Test that favorites and history skip library items and failures are reported."""
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    connector = JellyfinConnector(
+        server_url="https://jellyfin.example.com",
+        api_key="key",
+        user_id="user",
+        validated_ips=["93.184.216.34"],
+    )
+    connector._collect_items = AsyncMock(return_value=[{"Id": "1"}, {"Id": "2"}])
+    connector.get_favorites = AsyncMock(return_value=([{"Id": "2"}, {"Id": "3"}], None))
+    connector.get_recently_played = AsyncMock(side_effect=RuntimeError("timed out"))
+
+    items, error = await connector.get_all_indexable_data()
+
+    assert [(item["data"]["Id"], item["source"]) for item in items] == [
+        ("1", "library"),
+        ("2", "library"),
+        ("3", "favorite"),
+    ]
+    assert error == "Recently played: timed out"
+    await connector.aclose()
+
+
+def test_format_item_to_markdown_episode():
+    """Test the markdown layout for an episode with optional fields present and absent."""
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    connector = JellyfinConnector(
+        server_url="https://jellyfin.example.com",
+        api_key="key",
+        validated_ips=["93.184.216.34"],
+    )
+    item = {
+        "Type": "Episode",
+        "Name": "Pilot",
+        "ProductionYear": 2008,
+        "RunTimeTicks": 600_000_000 * 58,
+        "Genres": ["Drama"],
+        "SeriesName": "Breaking Bad",
+        "ParentIndexNumber": 1,
+        "IndexNumber": 1,
+        "Overview": "A teacher turns.",
+        "People": [
+            {"Type": "Actor", "Name": "Bryan Cranston"},
+            {"Type": "Director", "Name": "Vince Gilligan"},
+        ],
+    }
+
+    markdown = connector.format_item_to_markdown({"data": item, "source": "favorite"})
+
+    assert markdown == (
+        "# Pilot\n"
+        "**Year:** 2008\n"
+        "**Type:** Episode\n"
+        "**Status:** Favorite\n"
+        "**Runtime:** 58m\n"
+        "**Genres:** Drama\n"
+        "**Series:** Breaking Bad\n"
+        "**Season/Episode:** S01E01\n"
+        "\n## Overview\nA teacher turns.\n"
+        "\n**Cast:** Bryan Cranston\n"
+        "**Director:** Vince Gilligan"
+    )
+
+
+def test_handle_maps_status_codes():
+    """Test that responses decode on 200 and map 401/other codes to error messages."""
+    import httpx
+
+    from app.connectors.jellyfin_connector import JellyfinConnector
+
+    ok = httpx.Response(200, content=b'{"Items": [{"Id": "1"}]}')
+    assert JellyfinConnector._handle(ok, "items", ok_key="Items") == ([{"Id": "1"}], None)
+    assert JellyfinConnector._handle(httpx.Response(401), "items") == (None, "Invalid API key")
+    assert JellyfinConnector._handle(httpx.Response(500), "items") == (
+        None,
+        "Failed to get items: 500",
+    )
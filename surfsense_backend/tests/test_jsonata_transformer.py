@@ -10,7 +10,8 @@ Tests cover:
 
 import pytest
 
-from app.services.jsonata_transformer import JSONataTransformer
+from app.config.jsonata_templates import CONNECTOR_TEMPLATES
+from app.services.jsonata_transformer import JSONataTransformer, transformer as global_transformer
 
 
 @pytest.fixture
@@ -191,6 +192,16 @@ class TestJSONataTransformer:
         assert "slack" in templates
         assert "jira" in templates
 
+    def test_register_templates(self, transformer):
+        """Test registering several templates in one call."""
+        transformer.register_templates({"github": "{ }", "slack": "{ }"})
+
+        assert sorted(transformer.list_templates()) == ["github", "slack"]
+
+    def test_global_transformer_precompiles_connector_templates(self):
+        """Test the module-level transformer has every connector template compiled at import."""
+        assert set(global_transformer.list_templates()) == set(CONNECTOR_TEMPLATES)
+
     def test_has_template(self, transformer):
         """Test checking if template exists."""
         transformer.register_template("github", "{ }")
@@ -0,0 +1,465 @@
+"""
+Unit tests for RSS Connector parsing and formatting.
+"""
+
+import hashlib
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import orjson
+import pytest
+
+from app.connectors.rss_connector import RSSConnector, _html_to_md, _parse_feed_fast
+
+OPML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<opml version="2.0">
+  <head><title>Subscriptions</title></head>
+  <body>
+    <outline text="Tech">
+      <outline text="Example" title="Example Feed" xmlUrl="https://example.com/feed" htmlUrl="https://example.com"/>
+    </outline>
+    <outline text="Loose" xmlUrl="https://loose.example.com/rss"/>
+  </body>
+</opml>
+"""
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>Example News</title>
+    <link>https://example.com</link>
+    <description>Latest</description>
+    <item>
+      <title>First</title>
+      <link>https://example.com/1</link>
+      <guid>tag:example.com,1</guid>
+      <pubDate>Tue, 10 Jun 2025 04:00:00 -0400</pubDate>
+      <description>Short</description>
+      <content:encoded><![CDATA[<p>Long</p>]]></content:encoded>
+      <category>tech</category>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Atom</title>
+  <link href="https://example.org/"/>
+  <updated>2025-06-10T08:00:00Z</updated>
+  <entry>
+    <title>Entry</title>
+    <link rel="alternate" href="https://example.org/e"/>
+    <id>urn:uuid:1</id>
+    <updated>2025-06-10T08:00:00Z</updated>
+    <summary>Summary</summary>
+    <author><name>Ada</name></author>
+    <category term="science"/>
+  </entry>
+</feed>
+"""
+
+
+class TestParseFeedFast:
+    """Test suite for the lxml feed parser."""
+
+    def test_parse_rss(self):
+        """Test that RSS 2.0 items map onto the shared entry fields."""
+        feed, entries = _parse_feed_fast(RSS)
+
+        assert feed["title"] == "Example News"
+        assert entries == [
+            {
+                "title": "First",
+                "link": "https://example.com/1",
+                "guid": "tag:example.com,1",
+                "content": "<p>Long</p>",
+                "summary": "Short",
+                "published": datetime(2025, 6, 10, 8, 0, tzinfo=UTC),
+                "author": "",
+                "categories": ["tech"],
+            }
+        ]
+
+    def test_parse_atom(self):
+        """Test that Atom entries map onto the shared entry fields."""
+        feed, entries = _parse_feed_fast(ATOM)
+
+        assert feed["link"] == "https://example.org/"
+        assert feed["updated"] == datetime(2025, 6, 10, 8, 0, tzinfo=UTC)
+        assert entries[0]["link"] == "https://example.org/e"
+        assert entries[0]["guid"] == "urn:uuid:1"
+        assert entries[0]["content"] == "Summary"
+        assert entries[0]["author"] == "Ada"
+        assert entries[0]["categories"] == ["science"]
+
+    def test_streamed_items_keep_channel_metadata(self):
+        """Test that clearing items keeps metadata placed after them."""
+        items = "".join(
+            f"<item><title>Item {i}</title><guid>id-{i}</guid></item>"
+            for i in range(50)
+        )
+        feed, entries = _parse_feed_fast(
+            f'<rss version="2.0"><channel>{items}'
+            f"<title>Late Title</title></channel></rss>".encode()
+        )
+
+        assert feed["title"] == "Late Title"
+        assert [entry["guid"] for entry in entries] == [f"id-{i}" for i in range(50)]
+
+    def test_unsupported_documents_fall_back(self):
+        """Test that malformed XML and non-feed roots return None for feedparser."""
+        assert _parse_feed_fast(b"<rss><channel>") is None
+        assert _parse_feed_fast(b"<html><body>not a feed</body></html>") is None
+
+
+class TestParseFeedResponse:
+    """Test suite for _parse_feed_response."""
+
+    @pytest.mark.asyncio
+    async def test_rdf_feed_falls_back_to_feedparser(self):
+        """Test that RSS 1.0 is parsed by feedparser off the event loop."""
+        rdf = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">
+  <channel rdf:about="https://example.net/"><title>RDF Feed</title><link>https://example.net/</link></channel>
+  <item rdf:about="https://example.net/a"><title>A</title><link>https://example.net/a</link></item>
+</rdf:RDF>
+"""
+        feed, entries, error = await RSSConnector._parse_feed_response(
+            Mock(content=rdf)
+        )
+
+        assert error is None
+        assert feed["title"] == "RDF Feed"
+        assert [entry["link"] for entry in entries] == ["https://example.net/a"]
+
+    @pytest.mark.asyncio
+    async def test_xhtml_atom_content_is_kept(self):
+        """Test that inline XHTML Atom content falls back to feedparser intact."""
+        atom = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>XHTML Feed</title>
+  <entry>
+    <id>urn:x:1</id><title>One</title><updated>2024-01-02T03:04:05Z</updated>
+    <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Hello <b>world</b></p></div></content>
+  </entry>
+</feed>
+"""
+        assert _parse_feed_fast(atom) is None
+
+        feed, entries, error = await RSSConnector._parse_feed_response(
+            Mock(content=atom)
+        )
+
+        assert error is None
+        assert feed["title"] == "XHTML Feed"
+        assert entries[0]["content"] == "<p>Hello <b>world</b></p>"
+
+
+class TestParseOpml:
+    """Test suite for parse_opml."""
+
+    def test_parse_opml_extracts_feeds_and_categories(self):
+        """Test that feeds are found and nested outlines supply the category."""
+        feeds = RSSConnector.parse_opml(OPML)
+
+        assert feeds == [
+            {
+                "url": "https://example.com/feed",
+                "title": "Example Feed",
+                "html_url": "https://example.com",
+                "category": "Tech",
+            },
+            {
+                "url": "https://loose.example.com/rss",
+                "title": "Loose",
+                "html_url": "",
+                "category": "",
+            },
+        ]
+
+    def test_parse_opml_accepts_str_with_encoding_declaration(self):
+        """Test that decoded text with an XML declaration still parses."""
+        feeds = RSSConnector.parse_opml(OPML.decode("utf-8"))
+
+        assert len(feeds) == 2
+
+    def test_parse_opml_rejects_malformed_xml(self):
+        """Test that malformed OPML raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid OPML format"):
+            RSSConnector.parse_opml(b"<opml><body><outline></body>")
+
+
+class TestParseEntry:
+    """Test suite for _parse_entry deduplication."""
+
+    FEED_INFO = {"title": "Example News", "url": "https://example.com/feed"}
+
+    def test_repeated_entry_is_skipped(self):
+        """Test that an entry id already returned by the connector yields None."""
+        connector = RSSConnector(feed_urls=[])
+        _, entries = _parse_feed_fast(RSS)
+
+        first = connector._parse_entry(entries[0], self.FEED_INFO)
+
+        assert first["unique_id"]
+        assert connector._parse_entry(entries[0], self.FEED_INFO) is None
+
+    def test_seen_ids_are_bounded(self, monkeypatch):
+        """Test that the oldest ids are evicted once the cap is reached."""
+        monkeypatch.setattr("app.connectors.rss_connector.MAX_SEEN_ENTRY_IDS", 2)
+        connector = RSSConnector(feed_urls=[])
+        _, entries = _parse_feed_fast(RSS)
+
+        for guid in ("a", "b", "c"):
+            assert connector._parse_entry(
+                {**entries[0], "guid": guid}, self.FEED_INFO
+            )
+
+        assert len(connector._seen_ids) == 2
+        assert connector._parse_entry({**entries[0], "guid": "a"}, self.FEED_INFO)
+
+    def test_unique_id_matches_indexed_documents(self):
+        """Test that unique ids stay SHA-256 digests, as stored by the indexer."""
+        assert RSSConnector._generate_unique_id(
+            guid="urn:entry:1", title="", link="", published=""
+        ) == hashlib.sha256(b"urn:entry:1").hexdigest()
+        assert RSSConnector._generate_unique_id(
+            guid="", title="T", link="L", published="P"
+        ) == hashlib.sha256(b"T|L|P").hexdigest()
+
+
+class TestFetchFeed:
+    """Test suite for fetch_feed."""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_feed_skips_parsing(self):
+        """Test that validators are replayed and a 304 returns no entries."""
+        connector = RSSConnector(feed_urls=[])
+
+        first = Mock(status_code=200, content=RSS)
+        first.headers = {"ETag": '"v1"', "Last-Modified": "Tue, 10 Jun 2025 08:00:00 GMT"}
+        not_modified = Mock(status_code=304, headers={})
+        connector._safe_get_with_redirects = AsyncMock(
+            side_effect=[first, not_modified]
+        )
+
+        url = "https://example.com/feed"
+        feed_info, entries = await connector.fetch_feed(
+            url, validated_ips=["93.184.216.34"], client=Mock()
+        )
+        assert len(entries) == 1
+
+        cached_info, entries = await connector.fetch_feed(
+            url, validated_ips=["93.184.216.34"], client=Mock()
+        )
+        headers = connector._safe_get_with_redirects.call_args.args[2]
+
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Tue, 10 Jun 2025 08:00:00 GMT"
+        assert cached_info == feed_info
+        assert entries == []
+
+    @pytest.mark.asyncio
+    async def test_not_modified_feed_is_not_logged_as_empty(self, caplog):
+        """Test that a 304 feed is reported as not modified rather than empty."""
+        url = "https://example.com/feed"
+        feed_info = {"title": "Feed", "link": url, "description": "", "url": url}
+        connector = RSSConnector(
+            feed_urls=[url],
+            feed_validators={
+                url: {"etag": '"v1"', "last_modified": "", "feed_info": feed_info}
+            },
+        )
+        connector._validate_url_cached = AsyncMock(return_value=(url, ["93.184.216.34"]))
+        connector._safe_get_with_redirects = AsyncMock(
+            return_value=Mock(status_code=304, headers={})
+        )
+
+        with caplog.at_level("INFO"):
+            assert await connector.fetch_all_feeds() == []
+
+        assert "Feed not modified since last fetch" in caplog.text
+        assert "No entries fetched" not in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_validators_carry_over_to_a_new_connector(self):
+        """Test that validators saved from one run are sent by the next connector."""
+        url = "https://example.com/feed"
+        first_run = RSSConnector(feed_urls=[url])
+        response = Mock(status_code=200, content=RSS)
+        response.headers = {"ETag": '"v1"'}
+        first_run._safe_get_with_redirects = AsyncMock(return_value=response)
+        feed_info, _ = await first_run.fetch_feed(
+            url, validated_ips=["93.184.216.34"], client=Mock()
+        )
+
+        saved = orjson.loads(orjson.dumps(first_run.feed_validators))
+        second_run = RSSConnector(feed_urls=[url], feed_validators=saved)
+        second_run._safe_get_with_redirects = AsyncMock(
+            return_value=Mock(status_code=304, headers={})
+        )
+        cached_info, entries = await second_run.fetch_feed(
+            url, validated_ips=["93.184.216.34"], client=Mock()
+        )
+
+        headers = second_run._safe_get_with_redirects.call_args.args[2]
+        assert headers["If-None-Match"] == '"v1"'
+        assert cached_info == feed_info
+        assert entries == []
+
+
+    @pytest.mark.asyncio
+    async def test_entries_as_bytes(self):
+        """Test that as_bytes returns orjson-serialized entries."""
+        connector = RSSConnector(feed_urls=[])
+        response = Mock(status_code=200, content=RSS, headers={})
+        connector._safe_get_with_redirects = AsyncMock(return_value=response)
+
+        _, entries = await connector.fetch_feed(
+            "https://example.com/feed",
+            validated_ips=["93.184.216.34"],
+            client=Mock(),
+            as_bytes=True,
+        )
+
+        assert isinstance(entries[0], bytes)
+        assert orjson.loads(entries[0])["title"] == "First"
+
+
+class TestFormatEntryToMarkdown:
+    """Test suite for format_entry_to_markdown."""
+
+    ENTRY = {
+        "title": "First",
+        "feed_title": "Example News",
+        "author": "",
+        "published": "2025-06-10T08:00:00+00:00",
+        "link": "https://example.com/1",
+        "categories": ["tech"],
+        "summary": "",
+    }
+
+    def test_html_content_is_converted(self):
+        """Test that common tags map to markdown and active content is dropped."""
+        entry = {
+            **self.ENTRY,
+            "content": (
+                "<h2>Intro</h2><p>Hello <b>bold</b> and "
+                '<a href="https://example.com/x">a link</a>.</p>'
+                "<script>alert(1)</script><ul><li>one</li><li>two</li></ul>"
+            ),
+        }
+
+        markdown = RSSConnector.format_entry_to_markdown(entry)
+
+        assert markdown.endswith(
+            "## Content\n## Intro\n\nHello **bold** and "
+            "[a link](https://example.com/x).\n\n- one\n- two"
+        )
+        assert "alert" not in markdown
+
+    def test_missing_content_uses_placeholder(self):
+        """Test that entries without content or summary get a placeholder."""
+        markdown = RSSConnector.format_entry_to_markdown(
+            {**self.ENTRY, "content": ""}
+        )
+
+        assert markdown.endswith("## Content\nNo content available")
+
+
+class TestHtmlToMd:
+    """Test suite for the HTML to markdown conversion."""
+
+    def test_nested_lists_are_indented(self):
+        """Test that nested lists indent and ordered lists number their items."""
+        html = "<ul><li>a<ul><li>b<ol><li>c</li><li>d</li></ol></li></ul></li><li>e</li></ul>"
+
+        assert _html_to_md(html) == "- a\n  - b\n    1. c\n    2. d\n- e"
+
+    def test_blockquote_prefixes_every_line(self):
+        """Test that quoted paragraphs and nested quotes keep their markers."""
+        html = "<blockquote><p>one</p><p>two</p><blockquote>inner</blockquote></blockquote><p>after</p>"
+
+        assert _html_to_md(html) == "> one\n>\n> two\n>\n> > inner\n\nafter"
+
+    def test_pre_keeps_code_verbatim(self):
+        """Test that preformatted code keeps its indentation inside a fence."""
+        html = "<pre><code>def f():\n    return 1</code></pre><p>Use <code>f</code></p>"
+
+        assert _html_to_md(html) == "```\ndef f():\n    return 1\n```\n\nUse `f`"
+
+    def test_table_becomes_pipe_table(self):
+        """Test that table cells stay separated, with the first row as header."""
+        html = (
+            "<table>\n<tr><th> Name </th><th>Qty</th></tr>\n"
+            "<tr><td>apple</td><td><b>3</b></td></tr>\n</table>"
+        )
+
+        assert _html_to_md(html) == (
+            "| Name | Qty |\n| --- | --- |\n| apple | **3** |"
+        )
+
+    def test_definition_list_separates_terms(self):
+        """Test that terms and definitions do not run together."""
+        html = "<dl><dt>Term</dt><dd>Meaning</dd></dl>"
+
+        assert _html_to_md(html) == "Term\n: Meaning"
+
+
+class TestValidateUrlCached:
+    """Test suite for the SSRF validation cache."""
+
+    @pytest.mark.asyncio
+    async def test_validation_is_reused_until_expiry(self, monkeypatch):
+        """Test that a passing validation is cached and refreshed after the TTL."""
+        connector = RSSConnector(feed_urls=[])
+        url = "https://example.com/feed"
+        validator = AsyncMock(return_value=(url, ["93.184.216.34"]))
+        now = 1000.0
+        monkeypatch.setattr(
+            "app.connectors.rss_connector.time", Mock(monotonic=lambda: now)
+        )
+
+        with patch("app.connectors.rss_connector.validate_url_safe_for_ssrf", validator):
+            assert await connector._validate_url_cached(url) == (url, ["93.184.216.34"])
+            await connector._validate_url_cached(url)
+            assert validator.await_count == 1
+
+            now += 301
+            await connector._validate_url_cached(url)
+            assert validator.await_count == 2
+
+
+class TestFetchAllFeedsBatched:
+    """Test suite for fetch_all_feeds_batched."""
+
+    @pytest.mark.asyncio
+    async def test_entries_are_yielded_in_batches(self):
+        """Test that entries are split into lists of at most batch_size."""
+        connector = RSSConnector(feed_urls=["https://example.com/feed"])
+        connector.fetch_all_feeds = AsyncMock(
+            return_value=[{"unique_id": str(i)} for i in range(5)]
+        )
+
+        batches = [batch async for batch in connector.fetch_all_feeds_batched(2)]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert all(isinstance(batch, list) for batch in batches)
+
+
+class TestClientLifecycle:
+    """Test suite for the connector-owned HTTP client."""
+
+    @pytest.mark.asyncio
+    async def test_context_manager_shares_one_client(self):
+        """Test that requests reuse the open client and it is closed on exit."""
+        async with RSSConnector(feed_urls=[]) as connector:
+            client = connector._client
+            assert client is not None
+
+            async with connector._use_client(None) as used:
+                assert used is client
+
+        assert connector._client is None
+        assert client.is_closed
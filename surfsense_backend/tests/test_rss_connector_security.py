@@ -289,7 +289,7 @@ class TestIntegrationSSRFProtection:
             # Mock successful response
             mock_response = Mock()
             mock_response.status_code = 200
-            mock_response.text = """<?xml version="1.0"?>
+            mock_response.content = b"""<?xml version="1.0"?>
                 <rss version="2.0">
                     <channel>
                         <title>Test Feed</title>
@@ -0,0 +1,102 @@
+"""
+Unit tests for the RSS feed indexer.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.tasks.connector_indexers import rss_indexer
+
+FEED_A = "https://a.example.com/feed"
+FEED_B = "https://b.example.com/feed"
+
+
+def _entry(feed_url: str, guid: str, published: str = "2025-06-10T08:00:00+00:00") -> dict:
+    return {
+        "feed_url": feed_url,
+        "guid": guid,
+        "unique_id": guid,
+        "title": guid,
+        "published": published,
+    }
+
+
+@pytest.fixture
+def connector():
+    connector = Mock()
+    connector.config = {"FEED_URLS": [FEED_A, FEED_B]}
+    return connector
+
+
+@pytest.fixture
+def indexer(monkeypatch, connector):
+    """Run index_rss_feeds against mocked feeds, storage and embeddings."""
+    rss_client = Mock()
+    rss_client.feed_validators = {
+        FEED_A: {"etag": '"a1"', "last_modified": "", "feed_info": {"url": FEED_A}},
+        FEED_B: {"etag": '"b1"', "last_modified": "", "feed_info": {"url": FEED_B}},
+    }
+    rss_connector_cls = Mock(return_value=rss_client)
+    rss_connector_cls.format_entry_to_markdown = Mock(side_effect=lambda e: e["title"])
+
+    monkeypatch.setattr(rss_indexer, "RSSConnector", rss_connector_cls)
+    monkeypatch.setattr(rss_indexer, "TaskLoggingService", Mock(return_value=AsyncMock()))
+    monkeypatch.setattr(rss_indexer, "get_connector_by_id", AsyncMock(return_value=connector))
+    monkeypatch.setattr(
+        rss_indexer, "check_document_by_unique_identifier", AsyncMock(return_value=None)
+    )
+    monkeypatch.setattr(rss_indexer, "update_connector_last_indexed", AsyncMock())
+    monkeypatch.setattr(rss_indexer, "create_document_chunks", Mock(return_value=[]))
+    monkeypatch.setattr(rss_indexer, "Document", Mock())
+    monkeypatch.setattr(rss_indexer, "config", Mock())
+    monkeypatch.setattr(rss_indexer, "flag_modified", Mock())
+
+    session = AsyncMock()
+    session.add = Mock()
+
+    async def run(entries, **kwargs):
+        rss_client.fetch_all_feeds = AsyncMock(return_value=entries)
+        return await rss_indexer.index_rss_feeds(session, 1, 1, "user", **kwargs)
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_validators_saved_when_every_entry_is_indexed(indexer, connector):
+    """Test that feeds whose entries were all indexed keep their validators."""
+    indexed, error = await indexer([_entry(FEED_A, "a"), _entry(FEED_B, "b")])
+
+    assert (indexed, error) == (2, None)
+    assert set(connector.config["FEED_VALIDATORS"]) == {FEED_A, FEED_B}
+
+
+@pytest.mark.asyncio
+async def test_validators_dropped_for_feed_with_date_filtered_entry(indexer, connector):
+    """Test that a feed with an entry outside the date range is fetched in full next run."""
+    entries = [
+        _entry(FEED_A, "old", published="2020-01-01T00:00:00+00:00"),
+        _entry(FEED_B, "b"),
+    ]
+
+    indexed, _ = await indexer(entries, start_date="2025-01-01")
+
+    assert indexed == 1
+    assert set(connector.config["FEED_VALIDATORS"]) == {FEED_B}
+
+
+@pytest.mark.asyncio
+async def test_validators_dropped_for_feed_with_failed_entry(
+    indexer, connector, monkeypatch
+):
+    """Test that a feed with an entry that failed to index is fetched in full next run."""
+    monkeypatch.setattr(
+        rss_indexer,
+        "create_document_chunks",
+        Mock(side_effect=[RuntimeError("embedding service down"), []]),
+    )
+
+    indexed, _ = await indexer([_entry(FEED_A, "a"), _entry(FEED_B, "b")])
+
+    assert indexed == 1
+    assert set(connector.config["FEED_VALIDATORS"]) == {FEED_B}
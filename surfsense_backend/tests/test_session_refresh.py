@@ -0,0 +1,223 @@
+"""
+Unit tests for the sliding session middleware's refresh decision.
+"""
+
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from jose import jwt
+from starlette.responses import Response
+
+from app.middleware import session_refresh
+from app.middleware.session_refresh import SlidingSessionMiddleware
+
+SECRET = "test-secret"
+
+
+def _token(seconds_left: int) -> str:
+    return jwt.encode(
+        {"sub": "user", "exp": int(time.time()) + seconds_left},
+        SECRET,
+        algorithm="HS256",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_refresh_deadlines():
+    session_refresh._refresh_deadlines.clear()
+    session_refresh._recent_deadlines.clear()
+    yield
+    session_refresh._refresh_deadlines.clear()
+    session_refresh._recent_deadlines.clear()
+
+
+@pytest.fixture
+def middleware():
+    return SlidingSessionMiddleware(app=Mock())
+
+
+def test_fresh_token_is_not_refreshed(middleware):
+    """Test that a token with most of its lifetime left is kept as is."""
+    assert middleware._should_refresh_cookie(_token(20 * 3600)) is False
+
+
+def test_ageing_token_is_refreshed(middleware):
+    """Test that a token past the refresh threshold is refreshed."""
+    assert middleware._should_refresh_cookie(_token(3600)) is True
+
+
+def test_expired_token_is_not_refreshed(middleware):
+    """Test that a token past its exp is never re-issued."""
+    assert middleware._should_refresh_cookie(_token(-3600)) is False
+
+
+def test_cached_token_is_not_refreshed_after_expiry(middleware):
+    """Test that a cached deadline stops refreshing once the token expires."""
+    token = _token(3600)
+    assert middleware._should_refresh_cookie(token) is True
+
+    assert middleware._should_refresh_cookie(token, time.time() + 7200) is False
+
+
+def test_invalid_token_is_not_refreshed(middleware):
+    """Test that a malformed token never triggers a refresh."""
+    assert middleware._should_refresh_cookie("not-a-jwt") is False
+
+
+def test_malformed_token_is_rejected_before_decode(middleware):
+    """Test that tokens of the wrong shape or size are never decoded or cached."""
+    with patch.object(session_refresh, "_extract_exp") as decode:
+        assert middleware._should_refresh_cookie("a" * 200) is False
+        assert middleware._should_refresh_cookie("a.b.c") is False
+        assert middleware._should_refresh_cookie(_token(3600) + "." * 2) is False
+        assert middleware._should_refresh_cookie("a." + "b" * 5000 + ".c") is False
+        assert middleware._should_refresh_cookie(_token(3600) + "\r\nX: y") is False
+        assert middleware._should_refresh_cookie(_token(3600) + ";Path=/") is False
+
+    decode.assert_not_called()
+    assert not session_refresh._recent_deadlines
+
+
+def test_extract_exp():
+    """Test that exp is read from the payload segment and bad input yields None."""
+    token = _token(3600)
+    exp = jwt.get_unverified_claims(token)["exp"]
+
+    assert session_refresh._extract_exp(token) == exp
+    assert session_refresh._extract_exp("not-a-jwt") is None
+    assert session_refresh._extract_exp("a.!!!.c") is None
+    assert session_refresh._extract_exp(jwt.encode({"sub": "1"}, SECRET)) is None
+
+
+def test_scan_exp():
+    """Test the byte scan for exp and the cases it leaves to the JSON parser."""
+    assert session_refresh._scan_exp(b'{"sub":"1","exp":1700000000}') == 1700000000
+    assert session_refresh._scan_exp(b'{"exp": 42, "sub": "1"}') == 42
+    assert session_refresh._scan_exp(b'{"exp":1.5e9}') is None
+    assert session_refresh._scan_exp(b'{"sub":"1"}') is None
+    assert session_refresh._scan_exp(b'{"note":"\\"exp\\":1"}') is None
+    assert session_refresh._scan_exp(b'{"exp":"soon"}') is None
+
+
+def test_unreadable_token_is_decoded_and_logged_once(middleware, caplog):
+    """Test that a well-shaped token without exp is remembered as never refreshed."""
+    token = jwt.encode({"sub": "user-without-expiry", "scope": "x" * 64}, SECRET)
+
+    with patch.object(
+        session_refresh, "_extract_exp", wraps=session_refresh._extract_exp
+    ) as decode:
+        assert middleware._should_refresh_cookie(token) is False
+        assert middleware._should_refresh_cookie(token) is False
+
+    assert decode.call_count == 1
+    assert caplog.text.count("Unreadable JWT expiry") == 1
+
+
+def test_refresh_deadline_is_cached(middleware):
+    """Test that one decode serves later checks, including past the deadline."""
+    token = _token(20 * 3600)
+
+    with patch.object(
+        session_refresh, "_extract_exp", wraps=session_refresh._extract_exp
+    ) as decode:
+        assert middleware._should_refresh_cookie(token) is False
+        assert middleware._should_refresh_cookie(token) is False
+
+        later = time.time() + 10 * 3600
+        assert middleware._should_refresh_cookie(token, later) is True
+
+    assert decode.call_count == 1
+    assert token not in session_refresh._refresh_deadlines
+
+
+def test_front_cache_miss_uses_digest_cache(middleware):
+    """Test that a token evicted from the front cache is not decoded again."""
+    token = _token(20 * 3600)
+    middleware._should_refresh_cookie(token)
+    session_refresh._recent_deadlines.clear()
+
+    with patch.object(session_refresh, "_extract_exp") as decode:
+        assert middleware._should_refresh_cookie(token) is False
+
+    decode.assert_not_called()
+    assert token in session_refresh._recent_deadlines
+
+
+def _request(path: str = "/api/v1/documents", token: str | None = None) -> Mock:
+    request = Mock()
+    request.url.path = path
+    request.cookies = {"surfsense_auth": token} if token else {}
+    return request
+
+
+@pytest.mark.asyncio
+async def test_dispatch_leaves_anonymous_requests_alone(middleware):
+    """Test that requests without the auth cookie get no Set-Cookie header."""
+    response = await middleware.dispatch(
+        _request(), AsyncMock(return_value=Response("ok"))
+    )
+
+    assert "set-cookie" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_dispatch_refreshes_ageing_cookie(middleware):
+    """Test that an authenticated request past the threshold gets a new cookie."""
+    response = await middleware.dispatch(
+        _request(token=_token(3600)), AsyncMock(return_value=Response("ok"))
+    )
+
+    assert response.headers["set-cookie"].startswith("surfsense_auth=")
+
+
+@pytest.mark.asyncio
+async def test_dispatch_never_echoes_header_injection(middleware):
+    """Test that a cookie unquoted to contain CRLF is not written back."""
+    from starlette.requests import cookie_parser
+
+    cookies = cookie_parser(f'surfsense_auth="{_token(3600)}\\015\\012X-Injected: 1"')
+    request = _request(token=cookies["surfsense_auth"])
+    response = await middleware.dispatch(
+        request, AsyncMock(return_value=Response("ok"))
+    )
+
+    assert "\r\n" in request.cookies["surfsense_auth"]
+    assert "set-cookie" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_dispatch_cookie_matches_set_cookie(middleware):
+    """Test that the prebuilt header equals what Response.set_cookie emits."""
+    token = _token(3600)
+    response = await middleware.dispatch(
+        _request(token=token), AsyncMock(return_value=Response("ok"))
+    )
+
+    expected = Response()
+    expected.set_cookie(
+        key="surfsense_auth",
+        value=token,
+        max_age=session_refresh.TOKEN_LIFETIME_SECONDS,
+        httponly=True,
+        secure=session_refresh.cookie_transport.cookie_secure,
+        samesite=session_refresh.cookie_transport.cookie_samesite,
+        path=session_refresh.cookie_transport.cookie_path,
+        domain=session_refresh.cookie_transport.cookie_domain,
+    )
+    assert response.headers["set-cookie"] == expected.headers["set-cookie"]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_keeps_cookie_set_by_route(middleware):
+    """Test that a route's own auth cookie (e.g. logout) is not overridden."""
+    route_response = Response("ok")
+    route_response.delete_cookie("surfsense_auth")
+
+    response = await middleware.dispatch(
+        _request(token=_token(3600)), AsyncMock(return_value=route_response)
+    )
+
+    cookies = response.headers.getlist("set-cookie")
+    assert len(cookies) == 1
+    assert 'surfsense_auth=""' in cookies[0]